@@ -0,0 +1,111 @@
+import json
+import threading
+import time
+
+import pandas as pd
+
+from question_bank import normalize_tech
+
+# ---------- CANDIDATE ANALYTICS ----------
+# Aggregates for the admin dashboard, computed with pandas over one frame of all
+# candidates. The frame is built once and then only reads the rows added or updated
+# since the last refresh (by the store's row version, so regrades from the batch CLI
+# show up too), and the aggregates are recomputed only when the frame changed.
+ANALYTICS_REFRESH_INTERVAL = 5.0
+TOP_TECHNOLOGIES = 15
+
+# Where candidates left the interview, in flow order; "completed" answered everything
+FUNNEL_STATES = [
+    "ask_email", "ask_phone", "ask_experience", "ask_position", "ask_location",
+    "ask_tech_stack", "tech_questions", "farewell", "completed",
+]
+
+def candidate_frame(rows):
+    frame = pd.DataFrame.from_records(
+        rows, columns=["id", "grade", "grade_status", "desired_position", "created_at", "sentiment_score", "exit_state"]
+    ).set_index("id")
+    frame["grade"] = pd.to_numeric(frame["grade"], errors="coerce")
+    frame["sentiment_score"] = pd.to_numeric(frame["sentiment_score"], errors="coerce").fillna(0)
+    frame["exit_state"] = frame["exit_state"].fillna("unknown")
+    return frame
+
+def tech_frame(rows):
+    pairs = []
+    for row in rows:
+        try:
+            techs = json.loads(row["tech_stack"] or "[]")
+        except ValueError:
+            techs = []
+        # A candidate listing "Python, python3" counts once
+        pairs.extend((row["id"], tech) for tech in {normalize_tech(tech) for tech in techs if tech})
+    return pd.DataFrame(pairs, columns=["id", "tech"])
+
+class CandidateAnalytics:
+    def __init__(self, store, refresh_interval=ANALYTICS_REFRESH_INTERVAL):
+        self.store = store
+        self.refresh_interval = refresh_interval
+        self._candidates = candidate_frame([])
+        self._techs = tech_frame([])
+        self._last_version = 0
+        self._refreshed_at = 0.0
+        self._version = 0
+        self._summary = None
+        self._summary_version = -1
+        self._lock = threading.Lock()
+
+    def refresh(self, force=False):
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._refreshed_at < self.refresh_interval:
+                return
+            self._refreshed_at = now
+
+            changed = False
+            for rows in self.store.iter_summaries(after_version=self._last_version):
+                self._last_version = rows[-1]["version"]
+                changed = True
+                frame = candidate_frame(rows)
+                known = frame.index.isin(self._candidates.index)
+                if known.any():
+                    # Updated rows (grading, regrades) replace their old values
+                    updated = frame[known]
+                    self._candidates.loc[updated.index, updated.columns] = updated
+                    self._techs = self._techs[~self._techs["id"].isin(updated.index)]
+                if not known.all():
+                    # Appending to an empty frame would only upset pandas' dtype inference
+                    added = frame[~known]
+                    self._candidates = pd.concat([self._candidates, added]) if len(self._candidates) else added
+                techs = tech_frame(rows)
+                if len(techs):
+                    self._techs = pd.concat([self._techs, techs], ignore_index=True) if len(self._techs) else techs
+            if changed:
+                self._version += 1
+
+    def summary(self):
+        self.refresh()
+        with self._lock:
+            if self._summary_version != self._version:
+                self._summary = self._compute()
+                self._summary_version = self._version
+            return self._summary
+
+    def _compute(self):
+        candidates = self._candidates
+        graded = candidates.dropna(subset=["grade"])
+        grade_distribution = graded["grade"].astype(int).value_counts().reindex(range(1, 11), fill_value=0)
+        tech_frequency = self._techs["tech"].value_counts().head(TOP_TECHNOLOGIES)
+        sentiment_by_grade = graded.groupby(graded["grade"].astype(int))["sentiment_score"].agg(["mean", "count"])
+        sentiment_by_grade.columns = ["average sentiment", "candidates"]
+        exit_counts = candidates["exit_state"].value_counts()
+        funnel = exit_counts.reindex(FUNNEL_STATES, fill_value=0)
+        if "unknown" in exit_counts:
+            funnel["unknown"] = exit_counts["unknown"]
+        return {
+            "candidates": len(candidates),
+            "graded": len(graded),
+            "average_grade": float(graded["grade"].mean()) if len(graded) else None,
+            "grade_distribution": grade_distribution.rename_axis("grade").rename("candidates"),
+            "tech_frequency": tech_frequency.rename_axis("technology").rename("candidates"),
+            "sentiment_by_grade": sentiment_by_grade.rename_axis("grade"),
+            "funnel": funnel.rename_axis("left at").rename("candidates"),
+        }
@@ -1,20 +1,24 @@
 import streamlit as st
-import google.generativeai as genai
-import re
-import time
-import json
 import os
-import pandas as pd
+import time
 from dotenv import load_dotenv
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph
-from reportlab.lib.styles import getSampleStyleSheet
-from datetime import datetime
+import llm
+import telemetry
+from candidate_store import CandidateStore
+from export import EXPORT_FORMATS, ExportJob
+from grading import GradingQueue
+from question_bank import QuestionBank
+from session_store import SessionStore, new_token
+import interview
+from interview import SERVICE_UNAVAILABLE_MESSAGE, InterviewSession
+from datetime import datetime, timedelta
 
 # Load environment variables
 load_dotenv()
 API_KEY = os.getenv("GEMINI_API_KEY")
+ADMIN_PAGE_SIZE = 50
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "true").lower() == "true"
+CHAT_WINDOW = int(os.getenv("CHAT_WINDOW", "12"))
 
 # ---------- UI CONFIGURATION ----------
 st.set_page_config(
@@ -37,395 +41,474 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # ---------- SESSION STATE VARIABLES ----------
-if "messages" not in st.session_state:
-    st.session_state.messages = []
-if "candidate_info" not in st.session_state:
-    st.session_state.candidate_info = {
-        "name": None, "email": None, "phone": None, "experience": None,
-        "desired_position": None, "location": None, "tech_stack": [],
-        "answers": [], "questions": [], "grade": None
-    }
-if "current_state" not in st.session_state:
-    st.session_state.current_state = "greeting"
-if "current_tech" not in st.session_state:
-    st.session_state.current_tech = None
-if "current_tech_index" not in st.session_state:
-    st.session_state.current_tech_index = 0
-if "questions_asked" not in st.session_state:
-    st.session_state.questions_asked = 0
-if "sentiment_score" not in st.session_state:
-    st.session_state.sentiment_score = 0
-if "initialized" not in st.session_state:
-    st.session_state.initialized = False
 if "admin_logged_in" not in st.session_state:
     st.session_state.admin_logged_in = False
-if "all_candidates" not in st.session_state:
-    st.session_state.all_candidates = []
+if "report_job" not in st.session_state:
+    st.session_state.report_job = None
+if "export_job" not in st.session_state:
+    st.session_state.export_job = None
 
 # ---------- GEMINI AI CONFIGURATION ----------
-def configure_genai():
-    genai.configure(api_key=API_KEY)
-    return genai.GenerativeModel('gemini-2.0-flash-lite')
+@st.cache_resource
+def get_llm_client():
+    # Built once per process: reruns reuse the configured model and its open connection
+    # The SDK import and model construction run in the background so the first page render isn't blocked
+    client = llm.LLMClient(llm.submit(llm.create_model, API_KEY))
+    llm.submit(client.warm_up)
+    return client
 
-# ---------- VALIDATION FUNCTIONS ----------
-def validate_email(email):
-    pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-    return re.match(pattern, email) is not None
+@st.cache_resource
+def get_candidate_store():
+    return CandidateStore()
 
-def validate_phone(phone):
-    pattern = r'^\+?[0-9]{10,15}$'
-    return re.match(pattern, phone) is not None
+@st.cache_resource
+def get_report_builder():
+    # Shared so per-candidate report cells are reused across admins and reruns.
+    # reportlab is only needed once an admin asks for a report, so it's imported here.
+    from reports import ReportBuilder
+    return ReportBuilder()
 
-# ---------- ANALYSIS FUNCTIONS ----------
-def analyze_sentiment(text):
-    positive_words = [
-        'happy', 'great', 'good', 'excellent', 'thank', 'appreciate', 'excited',
-        'love', 'enjoy', 'passionate', 'interested', 'eager', 'enthusiastic', 
-        'delighted', 'pleased', 'satisfied', 'helpful', 'positive', 'wonderful',
-        'fantastic', 'amazing', 'awesome', 'impressive', 'brilliant', 'valuable',
-        'confident', 'skilled', 'capable', 'successful', 'experienced', 'effective'
-    ]
-    
-    negative_words = [
-        'bad', 'poor', 'frustrated', 'annoyed', 'difficult', 'problem', 'issue',
-        'hate', 'dislike', 'boring', 'confused', 'challenging', 'hard', 'worry',
-        'concerned', 'trouble', 'disappointed', 'negative', 'terrible', 'horrible',
-        'awful', 'unfortunate', 'struggle', 'complicated', 'uncertain', 'doubt',
-        'lacking', 'insufficient', 'ineffective', 'dissatisfied', 'unfamiliar'
-    ]
-    
-    text = text.lower()
-    sentiment = 0
-    
-    for word in positive_words:
-        if word in text:
-            sentiment += 1
-    
-    for word in negative_words:
-        if word in text:
-            sentiment -= 1
-            
-    return sentiment
+@st.cache_resource
+def get_analytics():
+    # One frame for all admins, extended incrementally; pandas is only imported here
+    from analytics import CandidateAnalytics
+    return CandidateAnalytics(get_candidate_store())
 
-def grade_candidate(model, candidate_info):
-    prompt = f"""
-    Please evaluate this tech candidate on a scale of 1-10 based on the following information:
-    
-    Name: {candidate_info.get('name', 'Unknown')}
-    Experience: {candidate_info.get('experience', 'N/A')}
-    Desired Position: {candidate_info.get('desired_position', 'N/A')}
-    Tech Stack: {', '.join(candidate_info.get('tech_stack', []))}
-    Sentiment Score: {candidate_info.get('sentiment_score', 0)}
-    
-    Technical Q&A:
-    """
-    
-    for q, a in zip(candidate_info.get('questions', []), candidate_info.get('answers', [])):
-        prompt += f"\nQ: {q}\nA: {a}\n"
-    
-    prompt += """
-    Return ONLY a single number from 1-10 representing their suitability for the role.
-    
-    Consider their experience level, technical knowledge depth, communication skills, 
-    and alignment of their tech stack with their desired position.
-    
-    Return only a number with no additional text.
-    """
-    
-    response = model.generate_content(prompt)
-    try:
-        grade = int(re.search(r'\d+', response.text).group())
-        return max(1, min(10, grade))
-    except:
-        return 5
+@st.cache_resource
+def get_candidate_index():
+    # Built once and then extended with new candidates, like the analytics frame
+    from search import CandidateIndex
+    return CandidateIndex(get_candidate_store())
 
-# ---------- INTERACTION FUNCTIONS ----------
-def check_exit(text):
-    exit_keywords = ['exit', 'quit', 'goodbye', 'bye', 'end', 'stop']
-    return any(keyword in text.lower() for keyword in exit_keywords)
+@st.cache_resource
+def get_grading_queue():
+    # Shared by every session so the worker pool stays bounded process-wide. Records a
+    # previous run left pending are queued again, as the new process starts.
+    queue = GradingQueue()
+    queue.resume(get_llm_client().with_priority(llm.BACKGROUND), get_candidate_store())
+    return queue
 
-def create_system_prompt():
-    return f"""
-    You are a hiring assistant chatbot for TalentScout, a recruitment agency specializing in technology placements.
-    Your name is TalentScout Assistant.
-    Your primary tasks are:
-    1. Collect candidate information (name, email, phone, experience, desired position, location, tech stack)
-    2. Ask relevant technical questions based on their declared tech stack
-    3. Maintain a professional and friendly tone throughout the conversation
-    
-    Current candidate information: {json.dumps(st.session_state.candidate_info, indent=2)}
-    Current state: {st.session_state.current_state}
-    
-    Rules:
-    - Keep responses concise and professional.
-    - Focus on collecting required information in a conversational manner.
-    - Generate one technical question at a time and analyze the answer before asking follow-up questions.
-    - The answer of the question should be short (1 - 2 lines maximum).
-    - Do not hallucinate or make up information about the candidate.
-    - Do not deviate from the purpose of candidate screening.
-    - If the candidate wants to end the conversation, thank them and close politely.
-    """
+@st.cache_resource
+def get_question_bank():
+    return QuestionBank()
 
-def generate_tech_question(model, tech, previous_answer=None, question_number=1):
-    if previous_answer:
-        prompt = f"""
-        Based on the candidate's previous answer: "{previous_answer}" 
-        to a question about {tech}, generate a follow-up technical question to further assess their knowledge.
-        The question should be related to their previous answer but explore a different aspect or go deeper into the topic.
-        The answer of the question should be short (few words or 1 - 2 lines maximum).
-        Return only the question itself with no additional text.
-        """
-    else:
-        prompt = f"""
-        Generate a single technical interview question to assess a candidate's proficiency in {tech}.
-        This is question #{question_number} about {tech}.
-        The question should require critical thinking and not be a simple definition or trivia.
-        The answer of the question should be short (few words or 1 - 2 lines maximum).
-        Return only the question itself with no additional text.
-        """
-    
-    response = model.generate_content(prompt)
-    return response.text.strip()
+@st.cache_resource
+def get_session_store():
+    return SessionStore()
 
-def analyze_answer(model, tech, question, answer):
-    prompt = f"""
-    Analyze this candidate's answer about {tech}:
-    
-    Question: {question}
-    Answer: {answer}
-    
-    Provide a brief assessment of the answer's technical accuracy and depth of knowledge. 
-    Consider factors like:
-    - Technical correctness
-    - Depth of understanding
-    - Practical experience indicated
-    
-    Keep your analysis brief (2-3 sentences max).
-    """
-    
-    response = model.generate_content(prompt)
-    return response.text.strip()
+@st.cache_resource
+def start_metrics_exporters():
+    # Once per process, by whichever session renders first
+    if telemetry.METRICS_FILE:
+        telemetry.start_file_exporter()
+    if telemetry.METRICS_PORT:
+        telemetry.start_http_exporter()
+    return True
 
-# ---------- REPORT GENERATION ----------
-def generate_pdf_report():
-    doc = SimpleDocTemplate("candidates_report.pdf", pagesize=letter)
-    styles = getSampleStyleSheet()
-    elements = []
-    
-    title = Paragraph(f"TalentScout Candidates Report - {datetime.now().strftime('%Y-%m-%d')}", styles["Heading1"])
-    elements.append(title)
-    elements.append(Paragraph("<br/><br/>", styles["Normal"]))
-    
-    for idx, candidate in enumerate(st.session_state.all_candidates):
-        name = candidate.get("name", "Unknown")
-        elements.append(Paragraph(f"Candidate #{idx+1}: {name}", styles["Heading2"]))
-        
-        sentiment = candidate.get("sentiment_score", 0)
-        sentiment_class = "Neutral"
-        if sentiment > 3:
-            sentiment_class = "Very Positive"
-        elif sentiment > 0:
-            sentiment_class = "Positive"
-        elif sentiment < 0:
-            sentiment_class = "Negative"
-        
-        basic_data = [
-            ["Email", candidate.get("email", "N/A")],
-            ["Phone", candidate.get("phone", "N/A")],
-            ["Experience", candidate.get("experience", "N/A")],
-            ["Position", candidate.get("desired_position", "N/A")],
-            ["Location", candidate.get("location", "N/A")],
-            ["Tech Stack", ", ".join(candidate.get("tech_stack", []))],
-            ["Sentiment Score", f"{sentiment} ({sentiment_class})"],
-            ["AI Grade", f"{candidate.get('grade', 'Not graded')}/10"]
-        ]
-        
-        basic_table = Table(basic_data, colWidths=[100, 400])
-        basic_table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-            ('TEXTCOLOR', (0, 0), (0, -1), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black)
-        ]))
-        elements.append(basic_table)
-        
-        if "questions" in candidate and "answers" in candidate:
-            elements.append(Paragraph("<br/>Technical Assessment:", styles["Heading3"]))
-            
-            cell_style = styles["Normal"]
-            cell_style.wordWrap = 'CJK'
-            
-            qa_data = [["Question", "Answer"]]
-            for q, a in zip(candidate.get("questions", []), candidate.get("answers", [])):
-                q_para = Paragraph(q, cell_style)
-                a_para = Paragraph(a, cell_style)
-                qa_data.append([q_para, a_para])
-            
-            if len(qa_data) > 1:
-                qa_table = Table(qa_data, colWidths=[250, 250])
-                qa_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
-                    ('TOPPADDING', (0, 0), (-1, -1), 6),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                elements.append(qa_table)
+# ---------- INTERVIEW HOOKS ----------
+def load_interview_session():
+    # The whole conversation lives in one InterviewSession. Its token is kept in the URL,
+    # so a reload or a server restart picks the interview up from its last checkpoint.
+    if "interview" in st.session_state:
+        return st.session_state.interview
+    token = st.query_params.get("session")
+    session = get_session_store().load(token) if token else None
+    if session is None:
+        token = new_token()
+        session = InterviewSession()
+    st.session_state.interview = session
+    st.session_state.session_token = token
+    st.query_params["session"] = token
+    return session
 
-        elements.append(Paragraph("<br/><br/>", styles["Normal"]))
-    
-    doc.build(elements)
-    return "candidates_report.pdf"
+def checkpoint_session():
+    try:
+        get_session_store().save(st.session_state.session_token, st.session_state.interview)
+    except Exception:
+        # Losing a checkpoint only matters if the server restarts before the next one
+        telemetry.registry.incr("session_checkpoint_failures_total")
+
+def finish_interview(model, state):
+    interview.finish_interview(model, state, get_grading_queue(), get_candidate_store())
+
+# ---------- REPORT GENERATION ----------
+def report_filters(min_grade, position, date_range):
+    filters = {}
+    if min_grade:
+        filters["min_grade"] = min_grade
+    if position.strip():
+        filters["position"] = position.strip()
+    if len(date_range) == 2:
+        start, end = date_range
+        filters["created_after"] = datetime.combine(start, datetime.min.time()).timestamp()
+        filters["created_before"] = datetime.combine(end + timedelta(days=1), datetime.min.time()).timestamp()
+    return filters
 
 # ---------- CONVERSATION FLOW ----------
-def process_user_input(model, user_input):
-    current_state = st.session_state.current_state
-    candidate_info = st.session_state.candidate_info
-    
-    if check_exit(user_input):
-        if candidate_info["name"]:
-            candidate_info["sentiment_score"] = st.session_state.sentiment_score
-            candidate_info["grade"] = grade_candidate(model, candidate_info)
-            st.session_state.all_candidates.append(candidate_info.copy())
+# Turns in these states fill in the sidebar's candidate panel, so they rerun the whole page
+PROFILE_STATES = {"ask_name", "ask_email", "ask_phone", "ask_experience", "ask_position", "ask_location", "ask_tech_stack"}
+
+def transcript_markdown(messages):
+    # One element for the whole collapsed history instead of a chat bubble per message
+    speakers = {"user": "You", "assistant": "TalentScout"}
+    return "\n\n".join(f"**{speakers.get(m['role'], m['role'])}:** {m['content']}" for m in messages)
+
+# ---------- ADMIN FUNCTIONS ----------
+def authenticate_admin(username, password):
+    return username == "admin" and password == "password"
+
+def reset_chat():
+    get_session_store().delete(st.session_state.session_token)
+    st.session_state.interview = InterviewSession()
+    st.session_state.session_token = new_token()
+    st.query_params["session"] = st.session_state.session_token
+
+def discard_export():
+    # Runs on the rerun the download click triggers, after Streamlit has the bytes
+    st.session_state.export_job.discard()
+    st.session_state.export_job = None
+
+def render_analytics_panel():
+    with st.expander("Analytics", expanded=False):
+        summary = get_analytics().summary()
+        if not summary["candidates"]:
+            st.info("No candidates yet")
+            return
+        average = f"{summary['average_grade']:.1f}" if summary["average_grade"] is not None else "n/a"
+        st.caption(f"{summary['candidates']} candidates, {summary['graded']} graded, average grade {average}")
         
-        st.session_state.current_state = "farewell"
-        return "Thank you for your time! Your information has been recorded. A TalentScout recruiter will contact you soon if your profile matches our open positions. Have a great day!"
-    
-    sentiment = analyze_sentiment(user_input)
-    st.session_state.sentiment_score += sentiment
-    
-    if current_state == "greeting":
-        st.session_state.current_state = "ask_name"
-        return "Welcome to TalentScout! I'm your hiring assistant, and I'll help with the initial screening process. Could you please tell me your full name?"
-    
-    elif current_state == "ask_name":
-        candidate_info["name"] = user_input
-        st.session_state.current_state = "ask_email"
-        return f"Nice to meet you, {user_input}! Could you please provide your email address so we can contact you?"
-    
-    elif current_state == "ask_email":
-        if validate_email(user_input):
-            candidate_info["email"] = user_input
-            st.session_state.current_state = "ask_phone"
-            return "Thank you! Now, could you share your phone number?"
-        else:
-            return "That doesn't appear to be a valid email address. Could you please provide a valid email?"
-    
-    elif current_state == "ask_phone":
-        if validate_phone(user_input):
-            candidate_info["phone"] = user_input
-            st.session_state.current_state = "ask_experience"
-            return "Great! How many years of professional experience do you have in the tech industry?"
-        else:
-            return "That doesn't appear to be a valid phone number. Please provide a valid phone number with 10-15 digits."
-    
-    elif current_state == "ask_experience":
-        candidate_info["experience"] = user_input
-        st.session_state.current_state = "ask_position"
-        return "Thank you for sharing your experience. What position(s) are you interested in applying for?"
-    
-    elif current_state == "ask_position":
-        candidate_info["desired_position"] = user_input
-        st.session_state.current_state = "ask_location"
-        return "Got it! Could you please tell me your current location or the location where you're seeking employment?"
-    
-    elif current_state == "ask_location":
-        candidate_info["location"] = user_input
-        st.session_state.current_state = "ask_tech_stack"
-        return "Thank you! Now, please list the technologies you're proficient in (programming languages, frameworks, databases, tools, etc.). Separate each with a comma."
-    
-    elif current_state == "ask_tech_stack":
-        tech_stack = [tech.strip() for tech in user_input.split(',')]
-        candidate_info["tech_stack"] = tech_stack
+        st.caption("Grade distribution")
+        st.bar_chart(summary["grade_distribution"])
+        st.caption("Most common technologies")
+        st.bar_chart(summary["tech_frequency"], horizontal=True)
+        st.caption("Sentiment by grade")
+        st.dataframe(summary["sentiment_by_grade"].round(2))
+        st.caption("Where candidates left the interview")
+        st.bar_chart(summary["funnel"], horizontal=True)
+
+def render_metrics_panel():
+    registry = telemetry.registry
+    with st.expander("Metrics", expanded=False):
+        counters = registry.counters()
+        tokens = {}
+        for name, labels, value in counters:
+            if name in ("llm_prompt_tokens_total", "llm_response_tokens_total"):
+                tokens[(labels.get("operation"), name)] = value
         
-        st.session_state.current_state = "tech_questions"
-        st.session_state.current_tech_index = 0
-        st.session_state.questions_asked = 0
+        spans = {"llm_request_seconds": [], "turn_seconds": [], "render_seconds": []}
+        for name, labels, count, total in registry.histograms():
+            if name in spans and count:
+                spans[name].append((labels, count, total))
         
-        if tech_stack:
-            st.session_state.current_tech = tech_stack[0]
-            first_question = generate_tech_question(model, st.session_state.current_tech)
-            candidate_info["questions"].append(first_question)
-            return f"Great! Let's assess your knowledge of {st.session_state.current_tech}. {first_question}"
-        else:
-            st.session_state.current_state = "farewell"
-            return "I notice you didn't specify any technologies. Unfortunately, we need this information to proceed. Would you like to try again and list your technical skills?"
-    
-    elif current_state == "tech_questions":
-        candidate_info["answers"].append(user_input)
+        if spans["llm_request_seconds"]:
+            st.caption("LLM calls by operation")
+            st.table([
+                {
+                    "operation": labels.get("operation"), "calls": count, "avg ms": round(total / count * 1000, 1),
+                    "prompt tokens": tokens.get((labels.get("operation"), "llm_prompt_tokens_total"), 0),
+                    "response tokens": tokens.get((labels.get("operation"), "llm_response_tokens_total"), 0),
+                }
+                for labels, count, total in spans["llm_request_seconds"]
+            ])
+        if spans["turn_seconds"]:
+            st.caption("Turns by state transition")
+            st.table([
+                {"from": labels.get("state"), "to": labels.get("next_state"), "turns": count, "avg ms": round(total / count * 1000, 1)}
+                for labels, count, total in spans["turn_seconds"]
+            ])
+        if spans["render_seconds"]:
+            st.caption("Rendering")
+            st.table([
+                {"section": labels.get("section"), "renders": count, "avg ms": round(total / count * 1000, 1)}
+                for labels, count, total in spans["render_seconds"]
+            ])
         
-        current_question = candidate_info["questions"][-1]
-        analysis = analyze_answer(model, st.session_state.current_tech, current_question, user_input)
+        other_counters = [
+            {"counter": name, "labels": ", ".join(f"{k}={v}" for k, v in labels.items()), "value": value}
+            for name, labels, value in counters if not name.startswith("llm_")
+        ]
+        if other_counters:
+            st.caption("Errors and fallbacks")
+            st.table(other_counters)
         
-        st.session_state.questions_asked += 1
+        recent = registry.recent_spans(20)
+        if recent:
+            st.caption("Recent spans")
+            st.table([
+                {"span": span["name"], "ms": round(span["duration"] * 1000, 1),
+                 "detail": ", ".join(f"{k}={v}" for k, v in span.items() if k not in ("name", "at", "duration"))}
+                for span in reversed(recent)
+            ])
         
-        if st.session_state.questions_asked < 2:
-            follow_up = generate_tech_question(
-                model, 
-                st.session_state.current_tech, 
-                previous_answer=user_input,
-                question_number=st.session_state.questions_asked + 1
+        st.download_button(
+            label="Download Prometheus metrics",
+            data=registry.render_prometheus(),
+            file_name="talentscout_metrics.prom",
+            mime="text/plain"
+        )
+
+@st.fragment
+def admin_panel(model):
+    # A fragment: paging through candidates or building a report reruns only this panel
+    st.success("Admin logged in")
+    
+    pending_grades = get_grading_queue().pending
+    if pending_grades:
+        st.caption(f"{pending_grades} candidate(s) waiting to be graded")
+    
+    cache_stats = get_question_bank().stats()
+    st.caption(
+        f"Question cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses "
+        f"({cache_stats['hit_rate']:.0%} hit rate, {cache_stats['entries']} entries)"
+    )
+    
+    llm_health = model.health if model else {"status": "error", "error": "client not configured"}
+    if llm_health["status"] == "error":
+        st.caption(f"Gemini health check failed: {llm_health['error']}")
+    elif llm_health["status"] == "ok":
+        st.caption(f"Gemini connection warm ({llm_health['latency'] * 1000:.0f} ms health check)")
+    
+    registry = telemetry.registry
+    st.caption(
+        f"Gemini: {registry.total('llm_calls_total')} calls, {registry.total('llm_throttled_total')} throttled, "
+        f"{registry.total('llm_rate_limited_total')} rate limited, {registry.total('llm_retries_total')} retries, "
+        f"{registry.total('llm_errors_total')} errors"
+    )
+    render_metrics_panel()
+    render_analytics_panel()
+    
+    store = get_candidate_store()
+    
+    # Generate PDF report
+    with st.expander("Report Filters", expanded=False):
+        report_min_grade = st.slider("Minimum AI grade", 0, 10, 0, key="report_min_grade")
+        report_position = st.text_input("Position", key="report_position")
+        report_dates = st.date_input("Interview dates", value=(), key="report_dates")
+    
+    if st.button("Generate PDF Report", key="generate_pdf"):
+        filters = report_filters(report_min_grade, report_position, report_dates)
+        if store.count(**filters):
+            from reports import ReportJob
+            st.session_state.report_job = ReportJob(get_report_builder(), store, **filters)
+        else:
+            st.warning("No candidate data available for the report")
+    
+    report_job = st.session_state.report_job
+    if report_job:
+        if report_job.status == "running":
+            st.progress(report_job.progress, text=f"Building report for {report_job.candidate_count} candidate(s)...")
+            st.button("Refresh", key="refresh_report")
+        elif report_job.status == "done":
+            st.download_button(
+                label="Download PDF Report",
+                data=report_job.result,
+                file_name=f"candidates_report_{datetime.now().strftime('%Y-%m-%d')}.pdf",
+                mime="application/pdf"
             )
-            candidate_info["questions"].append(follow_up)
-            return f"Thank you for your response. {follow_up}"
         else:
-            st.session_state.current_tech_index += 1
-            st.session_state.questions_asked = 0
-            
-            if st.session_state.current_tech_index < len(candidate_info["tech_stack"]):
-                st.session_state.current_tech = candidate_info["tech_stack"][st.session_state.current_tech_index]
-                next_question = generate_tech_question(model, st.session_state.current_tech)
-                candidate_info["questions"].append(next_question)
-                return f"Now, let's talk about your experience with {st.session_state.current_tech}. {next_question}"
+            st.error(f"Report generation failed: {report_job.error}")
+    
+    # Bulk export for ATS ingestion, written to a private staging file batch by batch
+    export_format = st.selectbox("Export format", EXPORT_FORMATS, key="export_format")
+    if st.button("Export All Candidates", key="export_candidates"):
+        if store.count():
+            if st.session_state.export_job:
+                st.session_state.export_job.discard()
+            st.session_state.export_job = ExportJob(store, export_format)
+        else:
+            st.warning("No candidate data available for export")
+    
+    export_job = st.session_state.export_job
+    if export_job:
+        if export_job.status == "running":
+            st.progress(export_job.progress, text=f"Exporting candidates as {export_job.format}...")
+            st.button("Refresh", key="refresh_export")
+        elif export_job.status == "done":
+            # Streamlit reads the file into its in-memory media store on every render
+            # and serves the download from there, so the export is held in memory only
+            # while its button is shown; the click drops the job and the staged file
+            export_file = export_job.open_file()
+            if export_file:
+                with export_file:
+                    st.download_button(
+                        label=f"Download {export_job.format.upper()} Export ({export_job.candidate_count} candidates)",
+                        data=export_file,
+                        file_name=export_job.file_name,
+                        mime=export_job.mime,
+                        on_click=discard_export
+                    )
             else:
-                st.session_state.current_state = "farewell"
-                
-                candidate_info["sentiment_score"] = st.session_state.sentiment_score
-                candidate_info["grade"] = grade_candidate(model, candidate_info)
-                
-                st.session_state.all_candidates.append(candidate_info.copy())
-                
-                return "Thank you for answering all the technical questions! Your responses have been recorded. A TalentScout recruiter will contact you soon if your profile matches our open positions. Is there anything else you'd like to add before we conclude?"
-    
-    elif current_state == "farewell":
-        return "Thank you for your time! Your information has been recorded. Feel free to reach out if you have any questions about the process. Have a great day!"
-    
+                st.warning("The export has expired, please export again")
+        else:
+            st.error(f"Export failed: {export_job.error}")
+    
+    # View candidates
+    st.subheader("All Candidates")
+    search_query = st.text_input(
+        "Search candidates", key="candidate_search",
+        placeholder="Kafka AND Go, grade >= 7",
+        help="Combine terms with AND (or a comma) and OR. Use tech:, position:, location: or answer: to pick a field.",
+    ).strip()
+    total_candidates = store.count()
+    if search_query:
+        candidate_labels = dict(get_candidate_index().search(search_query))
+        if candidate_labels:
+            st.caption(f"{len(candidate_labels)} matching candidate(s), newest first")
+        else:
+            st.info("No matching candidates")
+    elif total_candidates:
+        page_count = (total_candidates - 1) // ADMIN_PAGE_SIZE + 1
+        page = 1
+        if page_count > 1:
+            page = st.number_input(f"Page (of {page_count})", min_value=1, max_value=page_count, value=1)
+    
+        candidate_rows = store.page((page - 1) * ADMIN_PAGE_SIZE, ADMIN_PAGE_SIZE)
+        candidate_labels = {row["id"]: row["email"] or f"Unknown-{row['id']}" for row in candidate_rows}
     else:
-        chat_context = create_system_prompt()
-        for msg in st.session_state.messages[-5:]:
-            chat_context += f"\n{msg['role']}: {msg['content']}"
-        
-        chat_context += f"\nUser: {user_input}\nAssistant:"
+        candidate_labels = {}
+    
+    if candidate_labels:
+        selected_candidate_id = st.selectbox(
+            "Select Candidate", list(candidate_labels), format_func=candidate_labels.get
+        )
+        selected_candidate = store.get(selected_candidate_id)
+    
+        st.subheader(f"Candidate: {selected_candidate.get('name', 'Unknown')}")
+        st.info(f"Email: {selected_candidate.get('email', 'N/A')}")
+        st.info(f"Phone: {selected_candidate.get('phone', 'N/A')}")
+        st.info(f"Experience: {selected_candidate.get('experience', 'N/A')}")
+        st.info(f"Position: {selected_candidate.get('desired_position', 'N/A')}")
+        st.info(f"Location: {selected_candidate.get('location', 'N/A')}")
+        st.info(f"Tech Stack: {', '.join(selected_candidate.get('tech_stack', []))}")
+    
+        # Sentiment indicator
+        sentiment = selected_candidate.get("sentiment_score", 0)
+        st.subheader("Candidate Sentiment")
+        if sentiment > 3:
+            st.success("Very Positive")
+        elif sentiment > 0:
+            st.info("Positive")
+        elif sentiment == 0:
+            st.warning("Neutral")
+        else:
+            st.error("Negative")
+    
+        # Display AI-generated grade
+        grade = selected_candidate.get("grade")
+        grade_status = selected_candidate.get("grade_status", "graded")
+        st.subheader("AI Grade")
+    
+        if grade_status == "pending":
+            st.info("Grading in progress, refresh to see the result")
+        elif grade is None:
+            st.error("Grading failed")
+        elif grade >= 8:
+            st.success(f"High potential candidate: {grade}/10")
+        elif grade >= 4:
+            st.warning(f"Average potential candidate: {grade}/10")
+        else:
+            st.error(f"Low potential candidate: {grade}/10")
         
-        response = model.generate_content(chat_context)
-        return response.text
+        tech_scores = selected_candidate.get("tech_scores")
+        if tech_scores:
+            st.caption("By technology: " + ", ".join(f"{tech} {score}/10" for tech, score in tech_scores.items()))
+    
+        # Display Q&A
+        if "questions" in selected_candidate and "answers" in selected_candidate:
+            st.subheader("Technical Assessment")
+            analyses = selected_candidate.get("analyses", [])
+            scores = selected_candidate.get("scores", [])
+            for i, (q, a) in enumerate(zip(
+                selected_candidate.get("questions", []), 
+                selected_candidate.get("answers", [])
+            )):
+                st.write(f"**Q{i+1}:** {q}")
+                st.write(f"**A{i+1}:** {a}")
+                if i < len(analyses) and analyses[i]:
+                    score = scores[i] if i < len(scores) else None
+                    st.caption(f"Assessment ({score}/10): {analyses[i]}" if score else f"Assessment: {analyses[i]}")
+                st.divider()
+    elif not search_query:
+        st.info("No candidates have completed the interview yet")
 
-# ---------- ADMIN FUNCTIONS ----------
-def authenticate_admin(username, password):
-    return username == "admin" and password == "password"
-
-def reset_chat():
-    st.session_state.messages = []
-    st.session_state.candidate_info = {
-        "name": None, "email": None, "phone": None, "experience": None,
-        "desired_position": None, "location": None, "tech_stack": [],
-        "answers": [], "questions": [], "grade": None
-    }
-    st.session_state.current_state = "greeting"
-    st.session_state.current_tech = None
-    st.session_state.current_tech_index = 0
-    st.session_state.questions_asked = 0
-    st.session_state.sentiment_score = 0
-    st.session_state.initialized = False
+@st.fragment
+def chat_panel(model):
+    # A fragment: a turn reruns only the chat, not the sidebar and admin panel
+    session = st.session_state.interview
+    
+    # Only the latest messages are drawn as chat bubbles; older ones stay collapsed
+    # unless asked for, so a turn costs the same late in the interview as early on
+    render_started = time.perf_counter()
+    hidden = max(0, len(session.messages) - CHAT_WINDOW)
+    if hidden and st.toggle(f"Show {hidden} earlier messages", key="show_earlier_messages"):
+        st.markdown(transcript_markdown(session.messages[:hidden]))
+    for message in session.messages[hidden:]:
+        with st.chat_message(message["role"]):
+            st.markdown(message["content"])
+    telemetry.registry.record_span("render", time.perf_counter() - render_started, section="history")
+    
+    # Chat input
+    if user_input := st.chat_input("Type your message here..."):
+        st.chat_message("user").markdown(user_input)
+        session.messages.append({"role": "user", "content": user_input})
+        
+        # The model may still have been building when the page was drawn; a failed
+        # build is a configuration problem, not an outage worth retrying
+        if model and model.config_error():
+            model = None
+        if model:
+            turn_started = time.perf_counter()
+            state_before = session.current_state
+            with st.chat_message("assistant"):
+                turn_snapshot = session.snapshot()
+                try:
+                    with st.spinner("Thinking..."):
+                        assistant_response = session.reply(
+                            model, user_input, get_question_bank(), finish_interview, stream=STREAM_RESPONSES
+                        )
+                    # Streamed replies are rendered token by token as they arrive
+                    if isinstance(assistant_response, str):
+                        st.markdown(assistant_response)
+                    else:
+                        assistant_response = st.write_stream(assistant_response)
+                except Exception:
+                    # Gemini is still failing after the client's retries
+                    session.restore(turn_snapshot)
+                    telemetry.registry.incr("turn_fallbacks_total", state=state_before)
+                    assistant_response = SERVICE_UNAVAILABLE_MESSAGE
+                    st.markdown(assistant_response)
+            # Measured through the end of streaming, i.e. what the candidate waited for
+            telemetry.registry.record_span(
+                "turn", time.perf_counter() - turn_started,
+                state=state_before, next_state=session.current_state
+            )
+                    
+            session.messages.append({"role": "assistant", "content": assistant_response})
+            checkpoint_session()
+            
+            # Only the profile questions change the sidebar. Other turns are already on screen
+            # and need no rerun; the next fragment run redraws the window.
+            if state_before in PROFILE_STATES:
+                st.rerun()
+        else:
+            st.error("Unable to configure Gemini API. Please check your API key.")
 
 # ---------- MAIN APPLICATION ----------
 def main():
     st.title("TalentScout Hiring Assistant")
+    start_metrics_exporters()
+    session = load_interview_session()
+    render_started = time.perf_counter()
+    
+    # Initialize model
+    try:
+        model = get_llm_client()
+        config_error = model.config_error(wait=False)
+        if config_error:
+            raise config_error
+    except Exception as e:
+        st.error(f"Error configuring API: {e}")
+        model = None
     
     # Sidebar for configuration and candidate information
     with st.sidebar:
@@ -452,132 +535,35 @@ def main():
         
         # Admin controls when logged in
         if st.session_state.admin_logged_in:
-            st.success("Admin logged in")
-            
-            # Generate PDF report
-            if st.button("Generate PDF Report", key="generate_pdf"):
-                if st.session_state.all_candidates:
-                    pdf_path = generate_pdf_report()
-                    with open(pdf_path, "rb") as pdf_file:
-                        st.download_button(
-                            label="Download PDF Report",
-                            data=pdf_file,
-                            file_name="candidates_report.pdf",
-                            mime="application/pdf"
-                        )
-                else:
-                    st.warning("No candidate data available for the report")
-            
-            # View candidates
-            st.subheader("All Candidates")
-            if st.session_state.all_candidates:
-                candidate_emails = [c.get("email", f"Unknown-{i}") for i, c in enumerate(st.session_state.all_candidates)]
-                selected_candidate_email = st.selectbox("Select Candidate", candidate_emails)
-                
-                selected_candidate = next(
-                    (c for c in st.session_state.all_candidates if c.get("email") == selected_candidate_email), 
-                    st.session_state.all_candidates[0]
-                )
-                
-                st.subheader(f"Candidate: {selected_candidate.get('name', 'Unknown')}")
-                st.info(f"Email: {selected_candidate.get('email', 'N/A')}")
-                st.info(f"Phone: {selected_candidate.get('phone', 'N/A')}")
-                st.info(f"Experience: {selected_candidate.get('experience', 'N/A')}")
-                st.info(f"Position: {selected_candidate.get('desired_position', 'N/A')}")
-                st.info(f"Location: {selected_candidate.get('location', 'N/A')}")
-                st.info(f"Tech Stack: {', '.join(selected_candidate.get('tech_stack', []))}")
-                
-                # Sentiment indicator
-                sentiment = selected_candidate.get("sentiment_score", 0)
-                st.subheader("Candidate Sentiment")
-                if sentiment > 3:
-                    st.success("Very Positive")
-                elif sentiment > 0:
-                    st.info("Positive")
-                elif sentiment == 0:
-                    st.warning("Neutral")
-                else:
-                    st.error("Negative")
-                
-                # Display AI-generated grade
-                grade = selected_candidate.get("grade", "Not graded")
-                st.subheader("AI Grade")
-                
-                if grade >= 8:
-                    st.success(f"High potential candidate: {grade}/10")
-                elif grade >= 4:
-                    st.warning(f"Average potential candidate: {grade}/10")
-                else:
-                    st.error(f"Low potential candidate: {grade}/10")
-                
-                # Display Q&A
-                if "questions" in selected_candidate and "answers" in selected_candidate:
-                    st.subheader("Technical Assessment")
-                    for i, (q, a) in enumerate(zip(
-                        selected_candidate.get("questions", []), 
-                        selected_candidate.get("answers", [])
-                    )):
-                        st.write(f"**Q{i+1}:** {q}")
-                        st.write(f"**A{i+1}:** {a}")
-                        st.divider()
-            else:
-                st.info("No candidates have completed the interview yet")
+            admin_panel(model)
         
         # Regular user info display
         st.divider()
         st.header("Candidate Information")
-        if st.session_state.candidate_info["name"]:
-            st.info(f"Name: {st.session_state.candidate_info['name']}")
-        if st.session_state.candidate_info["email"]:
-            st.info(f"Email: {st.session_state.candidate_info['email']}")
-        if st.session_state.candidate_info["phone"]:
-            st.info(f"Phone: {st.session_state.candidate_info['phone']}")
-        if st.session_state.candidate_info["experience"]:
-            st.info(f"Experience: {st.session_state.candidate_info['experience']}")
-        if st.session_state.candidate_info["desired_position"]:
-            st.info(f"Position: {st.session_state.candidate_info['desired_position']}")
-        if st.session_state.candidate_info["location"]:
-            st.info(f"Location: {st.session_state.candidate_info['location']}")
-        if st.session_state.candidate_info["tech_stack"]:
-            st.info(f"Tech Stack: {', '.join(st.session_state.candidate_info['tech_stack'])}")
-    
-    # Initialize model
-    try:
-        model = configure_genai()
-    except Exception as e:
-        st.error(f"Error configuring API: {e}")
-        model = None
-    
-    # Display chat messages from history
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
+        candidate_info = session.candidate_info
+        if candidate_info["name"]:
+            st.info(f"Name: {candidate_info['name']}")
+        if candidate_info["email"]:
+            st.info(f"Email: {candidate_info['email']}")
+        if candidate_info["phone"]:
+            st.info(f"Phone: {candidate_info['phone']}")
+        if candidate_info["experience"]:
+            st.info(f"Experience: {candidate_info['experience']}")
+        if candidate_info["desired_position"]:
+            st.info(f"Position: {candidate_info['desired_position']}")
+        if candidate_info["location"]:
+            st.info(f"Location: {candidate_info['location']}")
+        if candidate_info["tech_stack"]:
+            st.info(f"Tech Stack: {', '.join(candidate_info['tech_stack'])}")
+    telemetry.registry.record_span("render", time.perf_counter() - render_started, section="sidebar")
     
     # Auto-start conversation if it's the first load
-    if not st.session_state.initialized and model:
-        initial_message = "Welcome to TalentScout! I'm your hiring assistant, and I'll help with the initial screening process. Could you please tell me your full name?"
-        st.session_state.messages.append({"role": "assistant", "content": initial_message})
-        st.session_state.current_state = "ask_name"
-        st.session_state.initialized = True
+    if not session.initialized and model:
+        session.start()
+        checkpoint_session()
         st.rerun()
     
-    # Chat input
-    if user_input := st.chat_input("Type your message here..."):
-        st.chat_message("user").markdown(user_input)
-        st.session_state.messages.append({"role": "user", "content": user_input})
-        
-        if model:
-            with st.chat_message("assistant"):
-                with st.spinner("Thinking..."):
-                    assistant_response = process_user_input(model, user_input)
-                    st.markdown(assistant_response)
-                    
-            st.session_state.messages.append({"role": "assistant", "content": assistant_response})
-            
-            time.sleep(0.5)
-            st.rerun()
-        else:
-            st.error("Unable to configure Gemini API. Please check your API key.")
+    chat_panel(model)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,110 @@
+# Stress check for background assessments landing in a live interview.
+#
+# Answer assessments finish on LLM threads and write into the session's candidate_info
+# while the session thread copies it for turn rollback, serializes it for checkpoints,
+# and the grading worker aggregates and stores the finished record. Each trial lets
+# the assessments land one after another while all of that runs, with ASSESSMENT_WAIT short
+# enough that grading overlaps the late ones. A trial fails if anything raises, or if
+# the stored record isn't graded once the queue drains. Exits non-zero on any failure.
+#
+#   python benchmarks/assessment_race.py --trials 200 --assessments 200
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+
+os.environ.setdefault("ASSESSMENT_WAIT", "0.01")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import llm
+from candidate_store import CandidateStore
+from grading import GradingQueue
+from interview import PER_ANSWER_KEYS, InterviewSession, finish_interview, record_analysis
+
+
+def interview_in_progress(assessments):
+    session = InterviewSession()
+    session.start()
+    candidate_info = session.candidate_info
+    # One technology per answer, so every assessment adds keys to tech_scores and tech_summaries
+    techs = [f"Tech{index}" for index in range(assessments)]
+    candidate_info.update(name="Race Candidate", email="race@example.com", experience="5 years",
+                          desired_position="Backend Engineer", tech_stack=techs)
+    futures = []
+    for index, tech in enumerate(techs):
+        candidate_info["questions"].append(f"Question {index} about {tech}?")
+        candidate_info["answers"].append(f"Answer {index} about {tech}")
+        for key in PER_ANSWER_KEYS:
+            candidate_info[key].append(None)
+        candidate_info["answer_techs"][-1] = tech
+        future = Future()
+        record_analysis(session, index, future, tech)
+        futures.append(future)
+    return session, futures
+
+def run_trial(model, store, grading_queue, assessments, land_interval):
+    session, futures = interview_in_progress(assessments)
+    start = threading.Barrier(2)
+
+    def land():
+        start.wait()
+        for index, future in enumerate(futures):
+            future.set_result({"assessment": f"Assessment {index}", "score": index % 10 + 1})
+            # Spread out, so the last ones land while the worker aggregates and stores
+            if land_interval:
+                time.sleep(land_interval)
+
+    lander = threading.Thread(target=land)
+    lander.start()
+    start.wait()
+    # The session thread's side: a failed turn rolled back, checkpoints, then the farewell
+    session.restore(session.snapshot())
+    for _ in range(5):
+        json.dumps(session.to_snapshot())
+    with session.lock:
+        session.candidate_info["exit_state"] = "completed"
+        record = finish_interview(model, session, grading_queue, store)
+    lander.join()
+
+    deadline = time.monotonic() + 10
+    while grading_queue.pending and time.monotonic() < deadline:
+        time.sleep(0.005)
+    stored = store.get(record["id"])
+    if stored["grade_status"] != "graded":
+        raise AssertionError(f"stored record is {stored['grade_status']!r}")
+    if session.pending_assessments:
+        raise AssertionError("assessments still pending after all of them landed")
+
+def main():
+    parser = argparse.ArgumentParser(description="Stress background assessments against rollback, checkpoints and grading.")
+    parser.add_argument("--trials", type=int, default=200)
+    parser.add_argument("--assessments", type=int, default=200, help="assessments landing per trial")
+    parser.add_argument("--land-interval", type=float, default=0.0005, help="seconds between two assessments landing")
+    args = parser.parse_args()
+    # Switch threads as often as possible, so races show up in a few hundred trials
+    sys.setswitchinterval(1e-6)
+
+    model = llm.LLMClient(llm.StubModel(), limiter=None)
+    failures = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        store = CandidateStore(os.path.join(scratch, "candidates.db"))
+        grading_queue = GradingQueue(max_workers=4)
+        for _ in range(args.trials):
+            try:
+                run_trial(model, store, grading_queue, args.assessments, args.land_interval)
+            except Exception as e:
+                reason = f"{type(e).__name__}: {e}"
+                failures[reason] = failures.get(reason, 0) + 1
+
+    failed = sum(failures.values())
+    print(f"{failed} of {args.trials} trial(s) failed")
+    for reason, count in sorted(failures.items(), key=lambda item: -item[1]):
+        print(f"  {count:>4}  {reason}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
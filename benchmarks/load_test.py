@@ -0,0 +1,192 @@
+# Headless load test for the interview flow.
+#
+# Drives scripted candidate conversations through interview.process_user_input
+# (ask_name -> ... -> tech_questions -> farewell) with the stub model, so it needs
+# neither a browser nor an API key. Each simulated session runs on its own thread,
+# sharing the LLM pool, question bank and grading queue the way app sessions do.
+#
+#   python benchmarks/load_test.py --sessions 50 --interviews 200 --latency 0.4 --jitter 0.15
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import llm
+import telemetry
+from grading import GradingQueue
+from interview import InterviewSession, finish_interview
+from question_bank import QuestionBank
+
+TECHNOLOGIES = ["Python", "Go", "PostgreSQL", "Kubernetes", "React", "Kafka", "Java", "AWS", "Docker", "Redis"]
+
+def interview_script(number, tech_count):
+    techs = [TECHNOLOGIES[(number + i) % len(TECHNOLOGIES)] for i in range(tech_count)]
+    script = [
+        f"Candidate {number}", f"candidate{number}@example.com", f"+1555{number:07d}",
+        "5 years", "Software Engineer", "Berlin", ", ".join(techs),
+    ]
+    for tech in techs:
+        script.append(f"I have used {tech} in production and I am confident with its trade-offs.")
+        script.append(f"I would profile first, then tune {tech} where the data points.")
+    script.append("Thanks, that's all from me.")
+    return script
+
+def run_interview(model, question_bank, on_finish, script, stream, think_time):
+    session = InterviewSession()
+    session.start()
+    turns = []
+    for text in script:
+        state_before = session.current_state
+        started = time.perf_counter()
+        reply = session.reply(model, text, question_bank, on_finish, stream=stream)
+        first_chunk = None
+        if not isinstance(reply, str):
+            parts = []
+            for chunk in reply:
+                if first_chunk is None:
+                    first_chunk = time.perf_counter() - started
+                parts.append(chunk)
+            reply = "".join(parts)
+        elapsed = time.perf_counter() - started
+        turns.append((state_before, elapsed, first_chunk if first_chunk is not None else elapsed))
+        session.messages.append({"role": "user", "content": text})
+        session.messages.append({"role": "assistant", "content": reply})
+        if think_time:
+            time.sleep(think_time)
+    return turns
+
+def percentile(sorted_values, fraction):
+    # Nearest-rank percentile
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+def latency_summary(values):
+    values = sorted(values)
+    return {
+        "count": len(values),
+        "p50": percentile(values, 0.50),
+        "p95": percentile(values, 0.95),
+        "p99": percentile(values, 0.99),
+        "max": values[-1] if values else 0.0,
+    }
+
+def run_load_test(sessions, interviews, tech_count, latency, jitter, stream=False, think_time=0.0, rpm=None):
+    stub = llm.StubModel(latency=latency, jitter=jitter)
+    limiter = llm.RateLimiter(rpm, burst=sessions) if rpm else None
+    model = llm.LLMClient(stub, limiter=limiter)
+    finished = []
+    finished_lock = threading.Lock()
+    grading_queue = GradingQueue(max_workers=max(2, sessions // 4))
+
+    def on_finish(model, state):
+        record = finish_interview(model, state, grading_queue)
+        with finished_lock:
+            finished.append(record)
+
+    with tempfile.TemporaryDirectory() as scratch:
+        question_bank = QuestionBank(path=os.path.join(scratch, "questions.json"))
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=sessions, thread_name_prefix="session") as executor:
+            results = list(executor.map(
+                lambda number: run_interview(
+                    model, question_bank, on_finish, interview_script(number, tech_count), stream, think_time
+                ),
+                range(interviews),
+            ))
+        elapsed = time.perf_counter() - started
+
+        # Background work (answer analysis, grading) still counts towards calls per interview
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline and (
+            grading_queue.pending or any(None in record["analyses"] for record in finished)
+        ):
+            time.sleep(0.05)
+        cache_stats = question_bank.stats()
+
+    llm_by_operation = {}
+    for name, labels, count, total in telemetry.registry.histograms():
+        if name == "llm_request_seconds" and count:
+            llm_by_operation[labels["operation"]] = {"calls": count, "mean": total / count}
+    for name, labels, value in telemetry.registry.counters():
+        if name in ("llm_prompt_tokens_total", "llm_response_tokens_total") and labels["operation"] in llm_by_operation:
+            llm_by_operation[labels["operation"]][name[len("llm_"):-len("_total")]] = value
+
+    turns = [turn for interview in results for turn in interview]
+    by_state = {}
+    for state_before, turn_latency, _ in turns:
+        by_state.setdefault(state_before, []).append(turn_latency)
+    return {
+        "sessions": sessions,
+        "interviews": interviews,
+        "technologies": tech_count,
+        "model_latency": latency,
+        "model_jitter": jitter,
+        "elapsed": elapsed,
+        "interviews_per_second": interviews / elapsed,
+        "turns_per_second": len(turns) / elapsed,
+        "turn_latency": latency_summary([turn[1] for turn in turns]),
+        "first_chunk_latency": latency_summary([turn[2] for turn in turns]),
+        "turn_latency_by_state": {state: latency_summary(values) for state, values in by_state.items()},
+        "llm_calls_per_interview": stub.calls / interviews,
+        "question_cache": cache_stats,
+        "llm_by_operation": llm_by_operation,
+    }
+
+def print_report(report):
+    def ms(seconds):
+        return f"{seconds * 1000:8.1f}"
+
+    print(
+        f"{report['interviews']} interviews, {report['sessions']} concurrent sessions, "
+        f"{report['technologies']} technologies each, model latency {report['model_latency'] * 1000:.0f}"
+        f"±{report['model_jitter'] * 1000:.0f} ms"
+    )
+    print(
+        f"elapsed {report['elapsed']:.2f}s  ({report['interviews_per_second']:.2f} interviews/s, "
+        f"{report['turns_per_second']:.1f} turns/s)"
+    )
+    print(f"LLM calls per interview: {report['llm_calls_per_interview']:.1f}  "
+          f"(question cache hit rate {report['question_cache']['hit_rate']:.0%})")
+    print()
+    print(f"{'turn latency (ms)':<22}{'count':>7}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    rows = [("all turns", report["turn_latency"]), ("first chunk", report["first_chunk_latency"])]
+    rows += sorted(report["turn_latency_by_state"].items())
+    for name, summary in rows:
+        print(f"{name:<22}{summary['count']:>7}{ms(summary['p50'])}{ms(summary['p95'])}{ms(summary['p99'])}{ms(summary['max'])}")
+    print()
+    print(f"{'LLM operation':<22}{'calls':>7}{'mean':>9}{'prompt tok':>12}{'reply tok':>11}")
+    for name, stats in sorted(report["llm_by_operation"].items()):
+        print(f"{name:<22}{stats['calls']:>7}{ms(stats['mean'])}{stats.get('prompt_tokens', 0):>12}{stats.get('response_tokens', 0):>11}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the interview flow with a simulated model.")
+    parser.add_argument("--sessions", type=int, default=20, help="concurrent simulated candidates")
+    parser.add_argument("--interviews", type=int, help="interviews to run in total (default: one per session)")
+    parser.add_argument("--techs", type=int, default=3, help="technologies declared per candidate")
+    parser.add_argument("--latency", type=float, default=0.3, help="mean model latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1, help="uniform latency jitter in seconds")
+    parser.add_argument("--stream", action="store_true", help="use streamed follow-up questions")
+    parser.add_argument("--think", type=float, default=0.0, help="candidate think time between turns in seconds")
+    parser.add_argument("--rpm", type=float, help="apply a shared rate limit (requests per minute)")
+    parser.add_argument("--json", metavar="PATH", help="write the report to a JSON file")
+    args = parser.parse_args()
+
+    report = run_load_test(
+        args.sessions, args.interviews or args.sessions, args.techs, args.latency, args.jitter,
+        stream=args.stream, think_time=args.think, rpm=args.rpm,
+    )
+    print_report(report)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as report_file:
+            json.dump(report, report_file, indent=2)
+
+if __name__ == "__main__":
+    main()
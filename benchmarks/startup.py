@@ -0,0 +1,104 @@
+# Cold-start benchmark for app.py.
+#
+# Every measurement runs in a fresh interpreter, so nothing is shared between runs:
+#   import       - `import app` in bare mode (module-level imports and setup only)
+#   first_greeting - from process start to the greeting being rendered by a full script run
+#
+#   python benchmarks/startup.py --runs 5
+#   python benchmarks/startup.py --importtime 10   # slowest modules imported by app.py
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# os._exit skips joining the LLM pool, whose warm-up call may still be waiting on the network
+IMPORT_SNIPPET = """
+import os, sys, time
+started = time.perf_counter()
+import app
+print(time.perf_counter() - started)
+sys.stdout.flush()
+os._exit(0)
+"""
+
+FIRST_GREETING_SNIPPET = """
+import os, sys, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file("app.py", default_timeout=60)
+at.run()
+assert at.session_state.interview.messages, "no greeting rendered"
+print(time.perf_counter() - started)
+sys.stdout.flush()
+os._exit(0)
+"""
+
+def run_snippet(snippet, env, extra_args=()):
+    result = subprocess.run(
+        [sys.executable, *extra_args, "-c", snippet], cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Benchmark run failed:\n{result.stderr[-2000:]}")
+    return result
+
+def measure(snippet, env, runs):
+    timings = [float(run_snippet(snippet, env).stdout.strip().splitlines()[-1]) for _ in range(runs)]
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "max": max(timings),
+        "runs": runs,
+    }
+
+def slowest_imports(env, count):
+    # -X importtime lines: "import time: self [us] | cumulative | imported package", where the
+    # package name is indented two spaces per nesting level; modules app.py imports directly sit at level one
+    stderr = run_snippet(IMPORT_SNIPPET, env, ("-X", "importtime")).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if len(name) - len(name.lstrip()) == 3:
+            rows.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(rows, reverse=True)[:count]
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure TalentScout cold-start time.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--importtime", type=int, metavar="N", help="also list the N slowest modules imported by app.py")
+    parser.add_argument("--json", metavar="PATH", help="write the results to a JSON file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        # Keep benchmark runs away from the real candidate database and question cache
+        env = dict(
+            os.environ,
+            CANDIDATE_DB_PATH=os.path.join(scratch, "candidates.db"),
+            QUESTION_CACHE_PATH=os.path.join(scratch, "questions.json"),
+        )
+        results = {
+            "python": sys.version.split()[0],
+            "import": measure(IMPORT_SNIPPET, env, args.runs),
+            "first_greeting": measure(FIRST_GREETING_SNIPPET, env, args.runs),
+        }
+        if args.importtime:
+            results["slowest_imports"] = slowest_imports(env, args.importtime)
+
+    for name in ("import", "first_greeting"):
+        timing = results[name]
+        print(f"{name:<15} median {timing['median'] * 1000:8.1f} ms  (min {timing['min'] * 1000:.1f}, max {timing['max'] * 1000:.1f}, {timing['runs']} runs)")
+    for seconds, module in results.get("slowest_imports", []):
+        print(f"  {seconds * 1000:8.1f} ms  {module}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as results_file:
+            json.dump(results, results_file, indent=2)
+
+if __name__ == "__main__":
+    main()
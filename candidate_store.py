@@ -0,0 +1,185 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+# ---------- CANDIDATE STORE ----------
+# Completed interviews live in SQLite so they survive restarts and every session
+# (and every admin) sees the same records. The full record is kept as JSON, with
+# the fields the admin panel filters and sorts on copied into indexed columns.
+# Every insert and update stamps the row with the next version number, so caches
+# built from the store (analytics, search) can read just what changed since.
+CANDIDATE_DB_PATH = os.getenv("CANDIDATE_DB_PATH", "talentscout.db")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS candidates (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    email TEXT,
+    name TEXT,
+    desired_position TEXT,
+    grade INTEGER,
+    grade_status TEXT,
+    created_at REAL NOT NULL,
+    data TEXT NOT NULL,
+    version INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_candidates_email ON candidates(email);
+CREATE INDEX IF NOT EXISTS idx_candidates_grade ON candidates(grade);
+CREATE INDEX IF NOT EXISTS idx_candidates_position ON candidates(desired_position COLLATE NOCASE);
+CREATE INDEX IF NOT EXISTS idx_candidates_created ON candidates(created_at);
+"""
+
+# Writes are serialized by SQLite, so versions increase in commit order
+NEXT_VERSION = "(SELECT COALESCE(MAX(version), 0) + 1 FROM candidates)"
+
+SUMMARY_COLUMNS = "id, email, name, desired_position, grade, grade_status, created_at"
+
+class CandidateStore:
+    def __init__(self, path=CANDIDATE_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        conn = self._connect()
+        with conn:
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(candidates)")}
+            if "version" not in columns:
+                # Databases from before row versions: existing rows count as written in id order
+                conn.execute("ALTER TABLE candidates ADD COLUMN version INTEGER")
+                conn.execute("UPDATE candidates SET version = id")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_candidates_version ON candidates(version)")
+
+    def _connect(self):
+        # sqlite3 connections can't be shared across threads, so each thread
+        # (script runs, grading workers) gets its own
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def add(self, candidate):
+        candidate.setdefault("created_at", time.time())
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                "INSERT INTO candidates (email, name, desired_position, grade, grade_status, created_at, data, version) "
+                f"VALUES (?, ?, ?, ?, ?, ?, ?, {NEXT_VERSION})",
+                (
+                    candidate.get("email"), candidate.get("name"), candidate.get("desired_position"),
+                    candidate.get("grade"), candidate.get("grade_status"), candidate["created_at"],
+                    self._dump(candidate),
+                ),
+            )
+        candidate["id"] = cursor.lastrowid
+        return candidate["id"]
+
+    def update(self, candidate):
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "UPDATE candidates SET email = ?, name = ?, desired_position = ?, grade = ?, grade_status = ?, data = ?, "
+                f"version = {NEXT_VERSION} WHERE id = ?",
+                (
+                    candidate.get("email"), candidate.get("name"), candidate.get("desired_position"),
+                    candidate.get("grade"), candidate.get("grade_status"), self._dump(candidate),
+                    candidate["id"],
+                ),
+            )
+
+    def get(self, candidate_id):
+        row = self._connect().execute("SELECT id, data FROM candidates WHERE id = ?", (candidate_id,)).fetchone()
+        return self._load(row) if row else None
+
+    def count(self, **filters):
+        where, params = self._where(**filters)
+        return self._connect().execute(f"SELECT COUNT(*) FROM candidates{where}", params).fetchone()[0]
+
+    def page(self, offset=0, limit=50, **filters):
+        # Newest first; only the summary columns, so a page never touches the JSON blobs
+        where, params = self._where(**filters)
+        rows = self._connect().execute(
+            f"SELECT {SUMMARY_COLUMNS} FROM candidates{where} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def iter_all(self, batch_size=500, **filters):
+        # Keyset pagination keeps memory flat no matter how many candidates are stored
+        where, params = self._where(**filters)
+        where = f"{where} AND id > ?" if where else " WHERE id > ?"
+        last_id = 0
+        while True:
+            rows = self._connect().execute(
+                f"SELECT id, data FROM candidates{where} ORDER BY id LIMIT ?", params + [last_id, batch_size]
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield self._load(row)
+            last_id = rows[-1]["id"]
+
+    def iter_changed(self, after_version=0, batch_size=500):
+        # (version, candidate) for every candidate added or updated after after_version, in version order
+        last_version = after_version
+        while True:
+            rows = self._connect().execute(
+                "SELECT id, version, data FROM candidates WHERE version > ? ORDER BY version LIMIT ?",
+                (last_version, batch_size),
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield row["version"], self._load(row)
+            last_version = rows[-1]["version"]
+
+    def iter_summaries(self, after_version=0, batch_size=5000):
+        # Batches of summary rows (plus the JSON fields analytics needs) for every
+        # candidate added or updated after after_version, in version order
+        columns = (
+            "id, version, grade, grade_status, desired_position, created_at, "
+            "json_extract(data, '$.sentiment_score') AS sentiment_score, "
+            "json_extract(data, '$.exit_state') AS exit_state, "
+            "json_extract(data, '$.tech_stack') AS tech_stack"
+        )
+        last_version = after_version
+        while True:
+            rows = self._connect().execute(
+                f"SELECT {columns} FROM candidates WHERE version > ? ORDER BY version LIMIT ?", (last_version, batch_size)
+            ).fetchall()
+            if not rows:
+                return
+            yield [dict(row) for row in rows]
+            last_version = rows[-1]["version"]
+
+    def _where(self, min_grade=None, position=None, created_after=None, created_before=None, grade_status=None):
+        clauses, params = [], []
+        if grade_status is not None:
+            clauses.append("grade_status = ?")
+            params.append(grade_status)
+        if min_grade is not None:
+            clauses.append("grade >= ?")
+            params.append(min_grade)
+        if position:
+            clauses.append("desired_position = ? COLLATE NOCASE")
+            params.append(position)
+        if created_after is not None:
+            clauses.append("created_at >= ?")
+            params.append(created_after)
+        if created_before is not None:
+            clauses.append("created_at < ?")
+            params.append(created_before)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    @staticmethod
+    def _dump(candidate):
+        return json.dumps({k: v for k, v in candidate.items() if k != "id"}, separators=(",", ":"))
+
+    @staticmethod
+    def _load(row):
+        candidate = json.loads(row["data"])
+        candidate["id"] = row["id"]
+        return candidate
@@ -0,0 +1,252 @@
+import argparse
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+from itertools import islice
+
+from candidate_store import CANDIDATE_DB_PATH, CandidateStore
+
+# ---------- BULK EXPORT ----------
+# Machine-readable exports of every stored candidate, one record per candidate with
+# its Q&A pairs, scores and grade. Candidates are read from the store in keyset
+# batches and each batch is written out before the next is read, so memory depends
+# on the batch size, not on how many candidates there are. Parquet output needs
+# pyarrow, which is only imported when that format is asked for.
+EXPORT_FORMATS = ("parquet", "csv", "jsonl")
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+PARQUET_COMPRESSION = "zstd"
+# Admin panel exports are staged here (owner-only) until they're downloaded; files a
+# crashed process left behind are swept by the next export once they are EXPORT_TTL
+# seconds old
+EXPORT_DIR = os.getenv("EXPORT_DIR", ".exports")
+EXPORT_TTL = float(os.getenv("EXPORT_TTL", "3600"))
+
+EXPORT_MIME_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+PROFILE_FIELDS = [
+    "id", "created_at", "name", "email", "phone", "experience", "desired_position", "location",
+    "tech_stack", "grade", "grade_status", "grade_method", "sentiment_score", "exit_state",
+]
+EXPORT_FIELDS = PROFILE_FIELDS + ["tech_scores", "qa"]
+
+def qa_pairs(candidate):
+    # questions[i] was answered by answers[i]; a question still open at the end has no answer
+    analyses = candidate.get("analyses") or []
+    scores = candidate.get("scores") or []
+    techs = candidate.get("answer_techs") or []
+    return [
+        {
+            "question": question,
+            "answer": answer,
+            "technology": techs[i] if i < len(techs) else None,
+            "assessment": analyses[i] if i < len(analyses) else None,
+            "score": scores[i] if i < len(scores) else None,
+        }
+        for i, (question, answer) in enumerate(zip(candidate.get("questions") or [], candidate.get("answers") or []))
+    ]
+
+def export_record(candidate):
+    record = {field: candidate.get(field) for field in PROFILE_FIELDS}
+    created_at = candidate.get("created_at")
+    record["created_at"] = datetime.fromtimestamp(created_at, timezone.utc) if created_at is not None else None
+    record["tech_stack"] = list(candidate.get("tech_stack") or [])
+    record["tech_scores"] = dict(candidate.get("tech_scores") or {})
+    record["qa"] = qa_pairs(candidate)
+    return record
+
+def batches(store, batch_size):
+    candidates = store.iter_all(batch_size=batch_size)
+    while True:
+        batch = [export_record(candidate) for candidate in islice(candidates, batch_size)]
+        if not batch:
+            return
+        yield batch
+
+def iso_timestamp(value):
+    return value.isoformat() if value is not None else None
+
+# ---------- WRITERS ----------
+# Each writer takes a binary file object and is fed one batch at a time
+
+class JSONLWriter:
+    def __init__(self, out):
+        self.out = out
+
+    def write(self, batch):
+        lines = []
+        for record in batch:
+            record = dict(record, created_at=iso_timestamp(record["created_at"]))
+            lines.append(json.dumps(record, ensure_ascii=False, separators=(",", ":")))
+        self.out.write(("\n".join(lines) + "\n").encode("utf-8"))
+
+    def close(self):
+        self.out.flush()
+
+class CSVWriter:
+    # One row per candidate; the tech stack is joined and the nested fields are JSON text
+    def __init__(self, out):
+        self.text = io.TextIOWrapper(out, encoding="utf-8", newline="")
+        self.writer = csv.DictWriter(self.text, fieldnames=EXPORT_FIELDS)
+        self.writer.writeheader()
+
+    def write(self, batch):
+        for record in batch:
+            self.writer.writerow(dict(
+                record,
+                created_at=iso_timestamp(record["created_at"]),
+                tech_stack=", ".join(record["tech_stack"]),
+                tech_scores=json.dumps(record["tech_scores"], ensure_ascii=False, separators=(",", ":")),
+                qa=json.dumps(record["qa"], ensure_ascii=False, separators=(",", ":")),
+            ))
+
+    def close(self):
+        # Hand the binary file back to the caller instead of closing it
+        self.text.flush()
+        self.text.detach()
+
+def parquet_schema():
+    import pyarrow as pa
+    qa = pa.struct([
+        ("question", pa.string()), ("answer", pa.string()), ("technology", pa.string()),
+        ("assessment", pa.string()), ("score", pa.int64()),
+    ])
+    return pa.schema([
+        ("id", pa.int64()), ("created_at", pa.timestamp("us", tz="UTC")),
+        ("name", pa.string()), ("email", pa.string()), ("phone", pa.string()), ("experience", pa.string()),
+        ("desired_position", pa.string()), ("location", pa.string()), ("tech_stack", pa.list_(pa.string())),
+        ("grade", pa.int64()), ("grade_status", pa.string()), ("grade_method", pa.string()),
+        ("sentiment_score", pa.float64()), ("exit_state", pa.string()),
+        ("tech_scores", pa.map_(pa.string(), pa.float64())), ("qa", pa.list_(qa)),
+    ])
+
+class ParquetWriter:
+    # Every batch becomes one row group, so only one batch is ever held in Arrow memory
+    def __init__(self, out, compression=PARQUET_COMPRESSION):
+        import pyarrow.parquet as pq
+        self.schema = parquet_schema()
+        self.writer = pq.ParquetWriter(out, self.schema, compression=compression)
+
+    def write(self, batch):
+        import pyarrow as pa
+        for record in batch:
+            record["tech_scores"] = list(record["tech_scores"].items())
+        self.writer.write_table(pa.Table.from_pylist(batch, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+WRITERS = {"parquet": ParquetWriter, "csv": CSVWriter, "jsonl": JSONLWriter}
+
+def export_candidates(store, out, fmt, batch_size=EXPORT_BATCH_SIZE, on_progress=None):
+    # Writes every candidate to the binary file object `out`; returns how many were written
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    total = store.count() if on_progress else 0
+    writer = WRITERS[fmt](out)
+    written = 0
+    try:
+        for batch in batches(store, batch_size):
+            writer.write(batch)
+            written += len(batch)
+            if on_progress:
+                on_progress(min(written / total, 1.0) if total else 1.0)
+    finally:
+        writer.close()
+    return written
+
+def export_file_name(fmt):
+    return f"candidates_{datetime.now().strftime('%Y-%m-%d')}.{fmt}"
+
+def export_dir():
+    os.makedirs(EXPORT_DIR, mode=0o700, exist_ok=True)
+    os.chmod(EXPORT_DIR, 0o700)
+    return EXPORT_DIR
+
+def remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def remove_stale_exports(ttl=EXPORT_TTL):
+    cutoff = time.time() - ttl
+    for entry in os.scandir(export_dir()):
+        if entry.is_file() and entry.stat().st_mtime < cutoff:
+            remove_file(entry.path)
+
+class ExportJob:
+    # Like ReportJob: exports on its own thread into a file in EXPORT_DIR, which the
+    # admin panel offers as a download once done. The file is removed once it has been
+    # downloaded or the job is discarded, when the job is garbage collected with its
+    # session, when the process exits, or at the latest by the EXPORT_TTL sweep.
+    def __init__(self, store, fmt):
+        self.format = fmt
+        self.file_name = export_file_name(fmt)
+        self.mime = EXPORT_MIME_TYPES[fmt]
+        self.progress = 0.0
+        self.status = "running"
+        self.error = None
+        self.candidate_count = 0
+        remove_stale_exports()
+        # mkstemp creates the file readable by its owner only
+        fd, self.path = tempfile.mkstemp(prefix="candidates_", suffix=f".{fmt}", dir=export_dir())
+        self._remove = weakref.finalize(self, remove_file, self.path)
+        self._thread = threading.Thread(target=self._run, args=(store, fd), daemon=True)
+        self._thread.start()
+
+    def _run(self, store, fd):
+        try:
+            with os.fdopen(fd, "wb") as out:
+                self.candidate_count = export_candidates(store, out, self.format, on_progress=self._set_progress)
+            self.status = "done"
+        except Exception as e:
+            self._remove()
+            self.error = str(e)
+            self.status = "failed"
+
+    def _set_progress(self, fraction):
+        self.progress = fraction
+
+    def open_file(self):
+        # The finished export as a binary file, or None once it has been removed
+        if self.status != "done":
+            return None
+        try:
+            return open(self.path, "rb")
+        except OSError:
+            return None
+
+    def discard(self):
+        if self.status != "running":
+            self._remove()
+
+def main():
+    parser = argparse.ArgumentParser(description="Export all stored TalentScout candidates.")
+    parser.add_argument("--db", default=CANDIDATE_DB_PATH, help="candidate database path")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="parquet", help="output format")
+    parser.add_argument("--output", "-o", help="output file, or - for stdout (defaults to candidates_<date>.<format>)")
+    parser.add_argument("--batch-size", type=int, default=EXPORT_BATCH_SIZE, help="candidates read and written per batch")
+    args = parser.parse_args()
+
+    store = CandidateStore(args.db)
+    output = args.output or export_file_name(args.format)
+    if output == "-":
+        count = export_candidates(store, sys.stdout.buffer, args.format, batch_size=max(1, args.batch_size))
+    else:
+        with open(output, "wb") as out:
+            count = export_candidates(store, out, args.format, batch_size=max(1, args.batch_size))
+    print(f"Exported {count} candidate(s) as {args.format} to {output}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
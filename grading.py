@@ -0,0 +1,336 @@
+import argparse
+import json
+import math
+import os
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import prompts
+import telemetry
+
+# ---------- GRADING ----------
+GRADING_WORKERS = int(os.getenv("GRADING_WORKERS", "2"))
+GRADING_RETRIES = int(os.getenv("GRADING_RETRIES", "3"))
+GRADING_BACKOFF = float(os.getenv("GRADING_BACKOFF", "2.0"))
+PACKED_MIN_BUDGET = 300
+
+def candidate_summary(candidate_info, budget=prompts.PROMPT_TOKEN_BUDGET):
+    # The transcript goes in as one digest line per tech, shortened evenly to fit the budget
+    builder = prompts.PromptBuilder(budget, name="grading")
+    builder.add(f"""
+    Name: {candidate_info.get('name', 'Unknown')}
+    Experience: {candidate_info.get('experience', 'N/A')}
+    Desired Position: {candidate_info.get('desired_position', 'N/A')}
+    Tech Stack: {', '.join(candidate_info.get('tech_stack', []))}
+    Sentiment Score: {candidate_info.get('sentiment_score', 0)}""")
+    builder.add(
+        prompts.transcript_lines(candidate_info), priority=1, title="Technical Q&A",
+        shorten=lambda max_chars: prompts.transcript_lines(candidate_info, max_chars)
+    )
+    return builder.build() + "\n"
+
+@telemetry.traced("grade_candidate")
+def grade_candidate(model, candidate_info):
+    prompt = "\n    Please evaluate this tech candidate on a scale of 1-10 based on the following information:\n    "
+    prompt += candidate_summary(candidate_info)
+    prompt += """
+    Return ONLY a single number from 1-10 representing their suitability for the role.
+    
+    Consider their experience level, technical knowledge depth, communication skills, 
+    and alignment of their tech stack with their desired position.
+    
+    Return only a number with no additional text.
+    """
+    
+    response = model.generate_content(prompt)
+    # An unparseable reply is an error, not an average grade; the caller retries or marks it failed
+    match = re.search(r'\d+', response.text)
+    if not match:
+        raise ValueError(f"No grade in response: {response.text[:100]!r}")
+    return max(1, min(10, int(match.group())))
+
+@telemetry.traced("grade_candidates_packed")
+def grade_candidates_packed(model, candidates):
+    # Several candidates in one prompt: fewer round trips for offline regrading
+    prompt = "\n    Please evaluate each of the following tech candidates on a scale of 1-10.\n    "
+    # Each candidate gets a share of the budget so a full pack stays about one prompt's size
+    budget = max(prompts.PROMPT_TOKEN_BUDGET // max(1, len(candidates)), PACKED_MIN_BUDGET)
+    for candidate in candidates:
+        prompt += f"\n    Candidate ID: {candidate['id']}" + candidate_summary(candidate, budget)
+    prompt += """
+    Return ONLY a JSON object mapping each Candidate ID to a number from 1-10,
+    for example {"12": 7, "15": 4}.
+    
+    Consider their experience level, technical knowledge depth, communication skills, 
+    and alignment of their tech stack with their desired position.
+    """
+    
+    response = model.generate_content(prompt)
+    match = re.search(r'\{.*\}', response.text, re.S)
+    if not match:
+        raise ValueError("No JSON object in packed grading response")
+    grades = json.loads(match.group())
+    return {int(candidate_id): max(1, min(10, int(grade))) for candidate_id, grade in grades.items()}
+
+# ---------- INCREMENTAL GRADING ----------
+# Every answer is scored as the interview goes (interview.record_assessment keeps a
+# running average per technology in candidate_info["tech_scores"]), so the final
+# grade is a local weighted average rather than another prompt over the transcript.
+# Technologies named in the desired position count double, and experience nudges
+# the result by up to a point either way.
+POSITION_FIT_WEIGHT = 2.0
+EXPERIENCE_ADJUSTMENTS = ((10, 1.0), (5, 0.5), (2, 0.0))
+JUNIOR_ADJUSTMENT = -0.5
+
+EXPERIENCE_PATTERN = re.compile(r'(\d+(?:\.\d+)?)\s*(years?|yrs?|months?|mos?)?\b', re.I)
+
+def experience_years(experience):
+    # "5", "5 years", "18 months" and "2 years 6 months"; the question asks for years,
+    # so a bare number counts as years unless it looks like a calendar year ("since 2015")
+    matches = EXPERIENCE_PATTERN.findall(experience or "")
+    if not matches:
+        return None
+    if not any(unit for _, unit in matches):
+        years = float(matches[0][0])
+        return years if years < 100 else None
+    return sum(float(number) / (12 if unit.lower().startswith("mo") else 1) for number, unit in matches if unit)
+
+def experience_adjustment(experience):
+    years = experience_years(experience)
+    if years is None:
+        return 0.0
+    for min_years, adjustment in EXPERIENCE_ADJUSTMENTS:
+        if years >= min_years:
+            return adjustment
+    return JUNIOR_ADJUSTMENT
+
+def fits_position(tech, position):
+    return bool(position) and re.search(rf'(?<![\w+#]){re.escape(tech.lower())}(?![\w+#])', position.lower()) is not None
+
+def aggregate_grade(candidate_info):
+    # None when no answer was scored (older records, or every assessment failed)
+    tech_scores = candidate_info.get("tech_scores") or {}
+    if not tech_scores:
+        return None
+    position = candidate_info.get("desired_position")
+    weights = {tech: POSITION_FIT_WEIGHT if fits_position(tech, position) else 1.0 for tech in tech_scores}
+    average = sum(score * weights[tech] for tech, score in tech_scores.items()) / sum(weights.values())
+    adjusted = average + experience_adjustment(candidate_info.get("experience"))
+    # Half grades round up; round() would send 6.5 down to 6 but 7.5 up to 8
+    return max(1, min(10, math.floor(adjusted + 0.5)))
+
+def with_retries(fn, retries=GRADING_RETRIES, backoff=GRADING_BACKOFF):
+    # Only unparseable replies are retried here; LLMClient already retries
+    # rate limits, timeouts and server errors with its own backoff
+    for attempt in range(retries + 1):
+        try:
+            return fn()
+        except ValueError:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * 2 ** attempt)
+
+def final_grade(model, candidate_info, retries=GRADING_RETRIES, backoff=GRADING_BACKOFF):
+    local_grade = aggregate_grade(candidate_info)
+    if local_grade is not None:
+        candidate_info["grade_method"] = "scores"
+        return local_grade
+    candidate_info["grade_method"] = "model"
+    return with_retries(lambda: grade_candidate(model, candidate_info), retries, backoff)
+
+# ---------- GRADING QUEUE ----------
+# Grading waits for the last answer assessments and may fall back to a full prompt,
+# so it runs on a small worker pool and the candidate record carries its status:
+# "pending" until a worker finishes, then "graded" (or "failed" if the model's grade
+# can't be had: the LLM client gave up, or the reply stayed unparseable after retries).
+class GradingQueue:
+    def __init__(self, max_workers=GRADING_WORKERS, retries=GRADING_RETRIES, backoff=GRADING_BACKOFF):
+        self.retries = retries
+        self.backoff = backoff
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="grading")
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self):
+        with self._lock:
+            return self._pending
+
+    def submit(self, model, candidate, on_complete=None, wait=None):
+        # wait() runs on the worker first, to bring in the interview's last assessments
+        candidate["grade"] = None
+        candidate["grade_status"] = "pending"
+        with self._lock:
+            self._pending += 1
+        return self._executor.submit(self._run, model, candidate, on_complete, wait)
+
+    def _run(self, model, candidate, on_complete, wait):
+        try:
+            try:
+                if wait is not None:
+                    wait()
+                candidate["grade"] = final_grade(model, candidate, self.retries, self.backoff)
+                candidate["grade_status"] = "graded"
+            except Exception:
+                candidate["grade_status"] = "failed"
+                telemetry.registry.incr("grading_failures_total")
+            if on_complete:
+                try:
+                    on_complete(candidate)
+                except Exception:
+                    # A record left "pending" would never be picked up again
+                    telemetry.registry.incr("grading_failures_total")
+                    candidate["grade_status"] = "failed"
+                    on_complete(candidate)
+            return candidate["grade"]
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def resume(self, model, store):
+        # Records still "pending" in the store were left by a process that stopped before
+        # grading them. Their interviews are over, so they are graded as stored.
+        resumed = 0
+        for candidate in store.iter_all(grade_status="pending"):
+            self.submit(model, candidate, on_complete=store.update)
+            resumed += 1
+        return resumed
+
+# ---------- BATCH GRADING ----------
+# Headless regrading of stored candidates, e.g. after a rubric change:
+#   python grading.py --concurrency 4 --pack 5
+# Candidates with per-answer scores are re-aggregated locally; only older records
+# without them go to the model.
+# Finished ids are appended to a checkpoint file, so a crashed run resumes where
+# it stopped; the file is removed once a run completes.
+def load_checkpoint(path):
+    try:
+        with open(path, "r", encoding="utf-8") as checkpoint_file:
+            return {int(line) for line in checkpoint_file if line.strip()}
+    except OSError:
+        return set()
+
+def grade_pack(model, pack, retries=GRADING_RETRIES, backoff=GRADING_BACKOFF):
+    # Same scale as live grading (final_grade): candidates with per-answer scores are
+    # aggregated locally, and only the rest are graded by the model
+    grades = {}
+    for candidate in pack:
+        local_grade = aggregate_grade(candidate)
+        if local_grade is not None:
+            candidate["grade_method"] = "scores"
+            grades[candidate["id"]] = local_grade
+    unscored = [candidate for candidate in pack if candidate["id"] not in grades]
+    for candidate in unscored:
+        candidate["grade_method"] = "model"
+    if len(unscored) > 1:
+        try:
+            packed = with_retries(lambda: grade_candidates_packed(model, unscored), retries, backoff)
+        except Exception:
+            packed = {}
+        grades.update({candidate["id"]: packed[candidate["id"]] for candidate in unscored if candidate["id"] in packed})
+    # Anything the packed reply missed is graded on its own
+    for candidate in unscored:
+        if candidate["id"] not in grades:
+            try:
+                grades[candidate["id"]] = with_retries(lambda: grade_candidate(model, candidate), retries, backoff)
+            except Exception:
+                grades[candidate["id"]] = None
+    return grades
+
+def run_batch(store, model, concurrency=4, pack_size=1, checkpoint_path=".grading_checkpoint",
+              only=None, limit=None, retries=GRADING_RETRIES, backoff=GRADING_BACKOFF, log=print):
+    done_ids = load_checkpoint(checkpoint_path)
+    if done_ids:
+        log(f"Resuming: skipping {len(done_ids)} candidate(s) already graded")
+
+    stats = {"graded": 0, "failed": 0, "skipped": len(done_ids), "elapsed": 0.0}
+    checkpoint_lock = threading.Lock()
+    started = time.perf_counter()
+
+    def pending_packs():
+        pack, queued = [], 0
+        for candidate in store.iter_all():
+            if candidate["id"] in done_ids or (only and candidate.get("grade_status") != only):
+                continue
+            if limit is not None and queued >= limit:
+                break
+            pack.append(candidate)
+            queued += 1
+            if len(pack) == pack_size:
+                yield pack
+                pack = []
+        if pack:
+            yield pack
+
+    def finish(pack, grades):
+        for candidate in pack:
+            grade = grades.get(candidate["id"])
+            if grade is None:
+                # A failed regrade leaves the stored grade and status as they were
+                stats["failed"] += 1
+                continue
+            candidate["grade"] = grade
+            candidate["grade_status"] = "graded"
+            store.update(candidate)
+            stats["graded"] += 1
+        with checkpoint_lock, open(checkpoint_path, "a", encoding="utf-8") as checkpoint_file:
+            checkpoint_file.write("".join(f"{candidate['id']}\n" for candidate in pack))
+
+    # Only a couple of packs per worker are in flight, so memory stays flat on large stores
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch-grading") as executor:
+        in_flight = {}
+        for pack in pending_packs():
+            in_flight[executor.submit(grade_pack, model, pack, retries, backoff)] = pack
+            if len(in_flight) >= concurrency * 2:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    finish(in_flight.pop(future), future.result())
+        for future in list(in_flight):
+            finish(in_flight.pop(future), future.result())
+
+    stats["elapsed"] = time.perf_counter() - started
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+    return stats
+
+def main():
+    from candidate_store import CANDIDATE_DB_PATH, CandidateStore
+    import llm
+
+    parser = argparse.ArgumentParser(description="Grade stored TalentScout candidates in bulk.")
+    parser.add_argument("--db", default=CANDIDATE_DB_PATH, help="candidate database path")
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent Gemini calls")
+    parser.add_argument("--pack", type=int, default=1, help="candidates graded per prompt")
+    parser.add_argument("--only", choices=["pending", "failed", "graded"], help="only regrade candidates with this status")
+    parser.add_argument("--limit", type=int, help="grade at most this many candidates")
+    parser.add_argument("--checkpoint", default=".grading_checkpoint", help="progress file used to resume")
+    parser.add_argument("--stub", action="store_true", help="use the offline stub model instead of Gemini")
+    parser.add_argument("--stub-latency", type=float, default=0.2, help="simulated stub latency in seconds")
+    parser.add_argument("--rpm", type=float, help="requests per minute (defaults to LLM_REQUESTS_PER_MINUTE; unlimited with --stub)")
+    args = parser.parse_args()
+
+    if args.stub:
+        model = llm.StubModel(latency=args.stub_latency, jitter=args.stub_latency / 4)
+        limiter = llm.RateLimiter(args.rpm, burst=args.concurrency) if args.rpm else None
+    else:
+        from dotenv import load_dotenv
+        load_dotenv()
+        model = llm.create_model(os.getenv("GEMINI_API_KEY"))
+        limiter = llm.RateLimiter(args.rpm, burst=args.concurrency) if args.rpm else llm.rate_limiter
+    model = llm.LLMClient(model, limiter=limiter, priority=llm.BACKGROUND)
+
+    stats = run_batch(
+        CandidateStore(args.db), model, concurrency=args.concurrency, pack_size=max(1, args.pack),
+        checkpoint_path=args.checkpoint, only=args.only, limit=args.limit,
+    )
+    total = stats["graded"] + stats["failed"]
+    rate = total / stats["elapsed"] if stats["elapsed"] else 0.0
+    print(
+        f"Graded {stats['graded']} candidate(s), {stats['failed']} failed, {stats['skipped']} skipped "
+        f"in {stats['elapsed']:.1f}s ({rate:.1f} candidates/s)"
+    )
+
+if __name__ == "__main__":
+    main()
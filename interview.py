@@ -0,0 +1,587 @@
+import asyncio
+import copy
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+import llm
+import prompts
+import telemetry
+from sentiment import analyze_sentiment, tokenize
+
+# ---------- INTERVIEW STATE ----------
+# The conversation flow only touches state through attributes, so it runs on any
+# object that has them. InterviewSession is the one every frontend uses: the
+# Streamlit app keeps one per browser session, server.py keeps thousands in memory.
+def new_candidate_info():
+    return {
+        "name": None, "email": None, "phone": None, "experience": None,
+        "desired_position": None, "location": None, "tech_stack": [],
+        "answers": [], "questions": [], "analyses": [], "scores": [], "answer_techs": [],
+        "tech_summaries": {}, "tech_scores": {}, "exit_state": None, "grade": None
+    }
+
+def reset_state(state):
+    state.messages = []
+    state.candidate_info = new_candidate_info()
+    state.current_state = "greeting"
+    state.current_tech = None
+    state.current_tech_index = 0
+    state.questions_asked = 0
+    state.sentiment_score = 0
+    state.prefetched_questions = []
+    state.initialized = False
+
+# Turns block on LLM calls, so async frontends run them on their own pool, which also
+# caps how many turns a process has in progress. It must not be the LLM pool, since a
+# turn waits on background work running there.
+INTERVIEW_WORKERS = int(os.getenv("INTERVIEW_WORKERS", "64"))
+
+_turn_executor = ThreadPoolExecutor(max_workers=INTERVIEW_WORKERS, thread_name_prefix="turn")
+
+# How long grading waits for the last answer assessments of a finished interview
+ASSESSMENT_WAIT = float(os.getenv("ASSESSMENT_WAIT", "60"))
+
+# Per-turn state that is rolled back when a turn fails, so the candidate can simply resend
+TURN_STATE_KEYS = ("candidate_info", "current_state", "current_tech", "current_tech_index", "questions_asked", "sentiment_score")
+
+# Checkpoints (session_store.py) carry everything but the prefetch futures; a resumed
+# session just fetches its next opening question from the question bank. Keys added
+# to candidate_info are filled in on restore; bump the version whenever the meaning
+# of an existing key changes.
+SNAPSHOT_VERSION = 1
+SNAPSHOT_KEYS = ("messages", "initialized") + TURN_STATE_KEYS
+
+# Lists that hold one entry per answer
+PER_ANSWER_KEYS = ("analyses", "scores", "answer_techs")
+
+# Derived from the Q&A, so stored candidates and checkpoints leave them out
+DERIVED_KEYS = ("tech_summaries",)
+
+def without_derived(candidate_info):
+    return {key: value for key, value in candidate_info.items() if key not in DERIVED_KEYS}
+
+class InterviewSession:
+    __slots__ = (
+        "messages", "candidate_info", "current_state", "current_tech", "current_tech_index",
+        "questions_asked", "sentiment_score", "prefetched_questions", "initialized", "lock",
+        "pending_assessments",
+    )
+
+    def __init__(self):
+        reset_state(self)
+        # Background assessments write into candidate_info from LLM threads; every write,
+        # and every copy or serialization of it, holds this lock
+        self.lock = threading.Lock()
+        # The assessments still running: future -> (answer index, answer, tech)
+        self.pending_assessments = {}
+
+    def start(self):
+        self.messages.append({"role": "assistant", "content": GREETING_MESSAGE})
+        self.current_state = "ask_name"
+        self.initialized = True
+        return GREETING_MESSAGE
+
+    def snapshot(self):
+        with self.lock:
+            return {key: copy.deepcopy(getattr(self, key)) for key in TURN_STATE_KEYS}
+
+    def restore(self, snapshot):
+        with self.lock:
+            self._restore(snapshot)
+
+    def _restore(self, snapshot):
+        live = self.candidate_info
+        for key, value in snapshot.items():
+            setattr(self, key, value)
+        # Background assessments aren't rolled back: the ones still running record into
+        # whichever record is live when they land, and the restored record takes over
+        # the ones that landed during the failed turn
+        restored = self.candidate_info
+        for index, answer in enumerate(restored["answers"]):
+            if (restored["scores"][index] is None and index < len(live["answers"]) and live["answers"][index] == answer
+                    and live["scores"][index] is not None):
+                result = {"assessment": live["analyses"][index], "score": live["scores"][index]}
+                record_assessment(restored, index, result, restored["answer_techs"][index])
+
+    def to_snapshot(self):
+        with self.lock:
+            candidate_info = copy.deepcopy(without_derived(self.candidate_info))
+        return {"version": SNAPSHOT_VERSION, **{key: getattr(self, key) for key in SNAPSHOT_KEYS}, "candidate_info": candidate_info}
+
+    @classmethod
+    def from_snapshot(cls, snapshot):
+        if snapshot.get("version") != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported session snapshot version: {snapshot.get('version')!r}")
+        session = cls()
+        for key in SNAPSHOT_KEYS:
+            if key in snapshot:
+                setattr(session, key, snapshot[key])
+        session.candidate_info = {**new_candidate_info(), **session.candidate_info}
+        for key in PER_ANSWER_KEYS:
+            missing = len(session.candidate_info["answers"]) - len(session.candidate_info[key])
+            session.candidate_info[key].extend([None] * missing)
+        session.candidate_info["tech_summaries"] = prompts.build_tech_summaries(session.candidate_info)
+        # Older checkpoints tracked running assessments in the record; they died with the old process
+        session.candidate_info.pop("pending_assessments", None)
+        return session
+
+    def reply(self, model, user_input, question_bank, on_finish, stream=False):
+        return process_user_input(model, user_input, self, question_bank, on_finish, stream)
+
+    async def respond(self, model, user_input, question_bank, on_finish):
+        # One full turn, recorded in the history; a failed turn leaves the session as it was.
+        # Callers must not run two turns of the same session at once.
+        loop = asyncio.get_running_loop()
+        snapshot = self.snapshot()
+        self.messages.append({"role": "user", "content": user_input})
+        try:
+            reply = await loop.run_in_executor(
+                _turn_executor, process_user_input, model, user_input, self, question_bank, on_finish
+            )
+        except Exception:
+            self.restore(snapshot)
+            self.messages.pop()
+            raise
+        self.messages.append({"role": "assistant", "content": reply})
+        return reply
+
+# ---------- VALIDATION FUNCTIONS ----------
+def validate_email(email):
+    pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
+    return re.match(pattern, email) is not None
+
+def validate_phone(phone):
+    pattern = r'^\+?[0-9]{10,15}$'
+    return re.match(pattern, phone) is not None
+
+# ---------- INTERACTION FUNCTIONS ----------
+EXIT_KEYWORDS = {'exit', 'quit', 'goodbye', 'bye', 'end', 'stop'}
+
+def check_exit(text):
+    # Whole words only, so "backend" or "frontend" don't end the interview
+    return not EXIT_KEYWORDS.isdisjoint(tokenize(text))
+
+def create_system_prompt(state):
+    return f"""
+    You are a hiring assistant chatbot for TalentScout, a recruitment agency specializing in technology placements.
+    Your name is TalentScout Assistant.
+    Your primary tasks are:
+    1. Collect candidate information (name, email, phone, experience, desired position, location, tech stack)
+    2. Ask relevant technical questions based on their declared tech stack
+    3. Maintain a professional and friendly tone throughout the conversation
+    
+    Current candidate information: {prompts.candidate_profile(state.candidate_info)}
+    Current state: {state.current_state}
+    
+    Rules:
+    - Keep responses concise and professional.
+    - Focus on collecting required information in a conversational manner.
+    - Generate one technical question at a time and analyze the answer before asking follow-up questions.
+    - The answer of the question should be short (1 - 2 lines maximum).
+    - Do not hallucinate or make up information about the candidate.
+    - Do not deviate from the purpose of candidate screening.
+    - If the candidate wants to end the conversation, thank them and close politely.
+    """
+
+def tech_question_prompt(tech, previous_answer=None, question_number=1):
+    if previous_answer:
+        prompt = f"""
+        Based on the candidate's previous answer: "{prompts.clip(previous_answer, prompts.ANSWER_CHARS)}" 
+        to a question about {tech}, generate a follow-up technical question to further assess their knowledge.
+        The question should be related to their previous answer but explore a different aspect or go deeper into the topic.
+        The answer of the question should be short (few words or 1 - 2 lines maximum).
+        Return only the question itself with no additional text.
+        """
+    else:
+        prompt = f"""
+        Generate a single technical interview question to assess a candidate's proficiency in {tech}.
+        This is question #{question_number} about {tech}.
+        The question should require critical thinking and not be a simple definition or trivia.
+        The answer of the question should be short (few words or 1 - 2 lines maximum).
+        Return only the question itself with no additional text.
+        """
+    return prompt
+
+@telemetry.traced("generate_tech_question")
+def generate_tech_question(model, tech, previous_answer=None, question_number=1):
+    response = model.generate_content(tech_question_prompt(tech, previous_answer, question_number))
+    return response.text.strip()
+
+@telemetry.traced("stream_tech_question")
+def stream_tech_question(model, tech, previous_answer=None, question_number=1):
+    prompt = tech_question_prompt(tech, previous_answer, question_number)
+    return llm.stream_text(model.generate_content(prompt, stream=True))
+
+def opening_question(model, tech, question_bank):
+    # Opening questions don't depend on the candidate, so they come from the shared bank
+    return question_bank.get_question(tech, 1, lambda: generate_tech_question(model, tech))
+
+def prefetch_opening_questions(model, state, question_bank):
+    # The first tech's question is asked right away, so only the rest are prefetched,
+    # behind interactive calls at the rate limiter
+    background = model.with_priority(llm.BACKGROUND)
+    state.prefetched_questions = question_bank.prefetch(
+        state.candidate_info["tech_stack"][1:], lambda tech: generate_tech_question(background, tech)
+    )
+
+def next_opening_question(model, state, question_bank):
+    tech_index = state.current_tech_index
+    prefetched = state.prefetched_questions
+    if 0 < tech_index <= len(prefetched):
+        future = prefetched[tech_index - 1]
+        # A prefetch that hasn't started yet is dropped and the question asked interactively
+        if not future.cancel():
+            try:
+                return future.result()
+            except Exception:
+                telemetry.registry.incr("prefetch_fallbacks_total")
+    return opening_question(model, state.candidate_info["tech_stack"][tech_index], question_bank)
+
+@telemetry.traced("analyze_answer")
+def analyze_answer(model, tech, question, answer):
+    prompt = f"""
+    Analyze this candidate's answer about {tech}:
+    
+    Question: {prompts.clip(question, prompts.QUESTION_CHARS)}
+    Answer: {prompts.clip(answer, prompts.USER_INPUT_CHARS)}
+    
+    Provide a brief assessment of the answer's technical accuracy and depth of knowledge. 
+    Consider factors like:
+    - Technical correctness
+    - Depth of understanding
+    - Practical experience indicated
+    
+    Keep your analysis brief (2-3 sentences max).
+    """
+    
+    response = model.generate_content(prompt)
+    return response.text.strip()
+
+# ---------- STRUCTURED ASSESSMENT ----------
+# With COMBINED_TURNS, one call per answer returns the assessment, a 1-10 score and
+# (when the flow needs one) the follow-up question as JSON, instead of a separate
+# analysis call and question call with almost the same context. A reply that doesn't
+# match the schema falls back to the two-call path.
+COMBINED_TURNS = os.getenv("COMBINED_TURNS", "true").lower() == "true"
+
+def assessment_prompt(tech, question, answer, follow_up):
+    fields = """
+    - "assessment": a brief assessment of the answer's technical accuracy and depth of knowledge (2-3 sentences max)
+    - "score": an integer from 1-10 rating the answer"""
+    if follow_up:
+        fields += """
+    - "next_question": a follow-up technical question related to the answer that explores a different aspect
+      or goes deeper into the topic. Its answer should be short (few words or 1 - 2 lines maximum)."""
+    return f"""
+    Assess this candidate's answer about {tech}:
+    
+    Question: {prompts.clip(question, prompts.QUESTION_CHARS)}
+    Answer: {prompts.clip(answer, prompts.USER_INPUT_CHARS)}
+    
+    Consider technical correctness, depth of understanding and practical experience indicated.
+    Return ONLY a JSON object with these keys:{fields}
+    """
+
+def parse_assessment(text, follow_up):
+    match = re.search(r'\{.*\}', text, re.S)
+    if not match:
+        raise ValueError("No JSON object in assessment response")
+    data = json.loads(match.group())
+    if not isinstance(data, dict):
+        raise ValueError("Assessment response is not a JSON object")
+    
+    assessment = data.get("assessment")
+    if not isinstance(assessment, str) or not assessment.strip():
+        raise ValueError("Assessment response has no assessment")
+    score = data.get("score")
+    if isinstance(score, bool) or not isinstance(score, (int, float, str)):
+        raise ValueError(f"Invalid score in assessment response: {score!r}")
+    try:
+        score = round(float(score))
+    except (ValueError, OverflowError):
+        raise ValueError(f"Invalid score in assessment response: {score!r}")
+    if not 1 <= score <= 10:
+        raise ValueError(f"Score out of range in assessment response: {score}")
+    
+    result = {"assessment": assessment.strip(), "score": score}
+    if follow_up:
+        next_question = data.get("next_question")
+        if not isinstance(next_question, str) or not next_question.strip():
+            raise ValueError("Assessment response has no next question")
+        result["next_question"] = next_question.strip()
+    return result
+
+@telemetry.traced("assess_answer")
+def assess_answer(model, tech, question, answer, follow_up=False):
+    response = model.generate_content(
+        assessment_prompt(tech, question, answer, follow_up),
+        generation_config={"response_mime_type": "application/json"}
+    )
+    return parse_assessment(response.text, follow_up)
+
+def background_assessment(model, tech, question, answer):
+    # Always scored, whatever COMBINED_TURNS says: the final grade is aggregated from
+    # these scores. Only a reply that doesn't parse falls back to a plain analysis.
+    try:
+        return assess_answer(model, tech, question, answer)
+    except ValueError:
+        telemetry.registry.incr("assessment_parse_failures_total", mode="background")
+    return {"assessment": analyze_answer(model, tech, question, answer), "score": None}
+
+def record_assessment(candidate_info, index, result, tech):
+    candidate_info["analyses"][index] = result["assessment"]
+    candidate_info["scores"][index] = result["score"]
+    if "tech_summaries" in candidate_info:
+        # Only the live record keeps summaries (see DERIVED_KEYS)
+        prompts.update_tech_summary(candidate_info, tech, index)
+    
+    # Running per-tech average, so the final grade is a local aggregation (grading.aggregate_grade)
+    tech_scores = [
+        score for score, answer_tech in zip(candidate_info["scores"], candidate_info["answer_techs"])
+        if answer_tech == tech and score is not None
+    ]
+    if tech_scores:
+        candidate_info["tech_scores"][tech] = round(sum(tech_scores) / len(tech_scores), 1)
+
+def record_analysis(state, index, future, tech):
+    # The analysis runs off the critical path; its slot is filled in whenever it lands.
+    # A failed turn may have swapped in a restored record by then, so the result goes
+    # to the session's live record, and only if that slot still holds the same answer.
+    # Until then it is listed in state.pending_assessments for finish_interview.
+    with state.lock:
+        answer = state.candidate_info["answers"][index]
+        state.pending_assessments[future] = (index, answer, tech)
+    
+    def _store(done):
+        try:
+            result = done.result()
+        except Exception:
+            result = None
+            telemetry.registry.incr("analysis_failures_total")
+        with state.lock:
+            state.pending_assessments.pop(done, None)
+            candidate_info = state.candidate_info
+            answers = candidate_info["answers"]
+            if index < len(answers) and answers[index] == answer:
+                if result:
+                    record_assessment(candidate_info, index, result, tech)
+                else:
+                    candidate_info["analyses"][index] = None
+
+    future.add_done_callback(_store)
+
+def await_assessments(record, pending, timeout=ASSESSMENT_WAIT):
+    # Fills a finished record in with the assessments that were still running when the
+    # interview ended; ones that miss the timeout are left out of it
+    done, _ = wait(pending, timeout=timeout)
+    for future in done:
+        index, answer, tech = pending[future]
+        try:
+            result = future.result()
+        except Exception:
+            continue
+        if result and index < len(record["answers"]) and record["answers"][index] == answer:
+            record_assessment(record, index, result, tech)
+
+@telemetry.traced("chat_reply")
+def generate_chat_reply(model, state, user_input, stream=False):
+    # The system prompt and the new message are kept whole; the transcript summary and
+    # recent messages share the rest of the budget, newest first
+    builder = prompts.PromptBuilder(name="chat_reply")
+    builder.add(create_system_prompt(state))
+    builder.add(
+        prompts.transcript_lines(state.candidate_info), priority=2, title="Technical answers so far",
+        shorten=lambda max_chars: prompts.transcript_lines(state.candidate_info, max_chars)
+    )
+    builder.add(
+        [f"{msg['role']}: {prompts.clip(msg['content'], prompts.MESSAGE_CHARS)}" for msg in state.messages[-5:]],
+        priority=1
+    )
+    builder.add(f"User: {prompts.clip(user_input, prompts.USER_INPUT_CHARS)}\nAssistant:")
+    chat_context = builder.build()
+    
+    if stream:
+        return llm.stream_text(model.generate_content(chat_context, stream=True))
+    
+    response = model.generate_content(chat_context)
+    return response.text
+
+# ---------- CONVERSATION FLOW ----------
+GREETING_MESSAGE = "Welcome to TalentScout! I'm your hiring assistant, and I'll help with the initial screening process. Could you please tell me your full name?"
+# What frontends reply when a turn fails; the turn is rolled back, so resending works
+SERVICE_UNAVAILABLE_MESSAGE = "Sorry, I'm having trouble reaching our assessment service right now. Could you please send your last message again in a moment?"
+
+def finish_interview(model, state, grading_queue, store=None):
+    # The on_finish of every frontend: the candidate gets the farewell right away and
+    # grading fills in the record later. Without a store the record is only graded.
+    # Called with state.lock held, so the record is copied together with the list of
+    # assessments still running; grading waits for those and applies them to its copy.
+    record = copy.deepcopy(without_derived(state.candidate_info))
+    record["grade_status"] = "pending"
+    pending = dict(state.pending_assessments)
+    if store is not None:
+        store.add(record)
+    grading_queue.submit(
+        model.with_priority(llm.BACKGROUND), record,
+        on_complete=store.update if store is not None else None,
+        wait=(lambda: await_assessments(record, pending)) if pending else None
+    )
+    return record
+
+def process_user_input(model, user_input, state, question_bank, on_finish, stream=False):
+    current_state = state.current_state
+    candidate_info = state.candidate_info
+    
+    if check_exit(user_input):
+        # exit_state records where the candidate left; an interview is only recorded once
+        if candidate_info["name"] and not candidate_info["exit_state"]:
+            with state.lock:
+                candidate_info["sentiment_score"] = state.sentiment_score
+                candidate_info["exit_state"] = current_state
+                on_finish(model, state)
+        
+        state.current_state = "farewell"
+        return "Thank you for your time! Your information has been recorded. A TalentScout recruiter will contact you soon if your profile matches our open positions. Have a great day!"
+    
+    sentiment = analyze_sentiment(user_input)
+    state.sentiment_score += sentiment
+    
+    if current_state == "greeting":
+        state.current_state = "ask_name"
+        return GREETING_MESSAGE
+    
+    elif current_state == "ask_name":
+        candidate_info["name"] = user_input
+        state.current_state = "ask_email"
+        return f"Nice to meet you, {user_input}! Could you please provide your email address so we can contact you?"
+    
+    elif current_state == "ask_email":
+        if validate_email(user_input):
+            candidate_info["email"] = user_input
+            state.current_state = "ask_phone"
+            return "Thank you! Now, could you share your phone number?"
+        else:
+            return "That doesn't appear to be a valid email address. Could you please provide a valid email?"
+    
+    elif current_state == "ask_phone":
+        if validate_phone(user_input):
+            candidate_info["phone"] = user_input
+            state.current_state = "ask_experience"
+            return "Great! How many years of professional experience do you have in the tech industry?"
+        else:
+            return "That doesn't appear to be a valid phone number. Please provide a valid phone number with 10-15 digits."
+    
+    elif current_state == "ask_experience":
+        candidate_info["experience"] = user_input
+        state.current_state = "ask_position"
+        return "Thank you for sharing your experience. What position(s) are you interested in applying for?"
+    
+    elif current_state == "ask_position":
+        candidate_info["desired_position"] = user_input
+        state.current_state = "ask_location"
+        return "Got it! Could you please tell me your current location or the location where you're seeking employment?"
+    
+    elif current_state == "ask_location":
+        candidate_info["location"] = user_input
+        state.current_state = "ask_tech_stack"
+        return "Thank you! Now, please list the technologies you're proficient in (programming languages, frameworks, databases, tools, etc.). Separate each with a comma."
+    
+    elif current_state == "ask_tech_stack":
+        tech_stack = [tech.strip() for tech in user_input.split(',') if tech.strip()]
+        candidate_info["tech_stack"] = tech_stack
+        
+        state.current_state = "tech_questions"
+        state.current_tech_index = 0
+        state.questions_asked = 0
+        
+        if tech_stack:
+            state.current_tech = tech_stack[0]
+            prefetch_opening_questions(model, state, question_bank)
+            first_question = opening_question(model, state.current_tech, question_bank)
+            candidate_info["questions"].append(first_question)
+            return f"Great! Let's assess your knowledge of {state.current_tech}. {first_question}"
+        else:
+            state.current_state = "farewell"
+            return "I notice you didn't specify any technologies. Unfortunately, we need this information to proceed. Would you like to try again and list your technical skills?"
+    
+    elif current_state == "tech_questions":
+        with state.lock:
+            candidate_info["answers"].append(user_input)
+            for key in PER_ANSWER_KEYS:
+                candidate_info[key].append(None)
+            candidate_info["answer_techs"][-1] = state.current_tech
+            answer_index = len(candidate_info["answers"]) - 1
+            prompts.update_tech_summary(candidate_info, state.current_tech, answer_index)
+        current_question = candidate_info["questions"][-1]
+        
+        state.questions_asked += 1
+        needs_follow_up = state.questions_asked < 2
+        
+        follow_up = None
+        if COMBINED_TURNS and needs_follow_up:
+            try:
+                result = assess_answer(model, state.current_tech, current_question, user_input, follow_up=True)
+                with state.lock:
+                    record_assessment(candidate_info, answer_index, result, state.current_tech)
+                follow_up = result["next_question"]
+            except ValueError:
+                telemetry.registry.incr("assessment_parse_failures_total", mode="combined")
+        
+        if follow_up is None:
+            # Analysis and the next question are independent, so they run concurrently
+            analysis_future = llm.submit(
+                background_assessment, model.with_priority(llm.BACKGROUND), state.current_tech,
+                current_question, user_input
+            )
+            record_analysis(state, answer_index, analysis_future, state.current_tech)
+        
+        if needs_follow_up:
+            if follow_up:
+                candidate_info["questions"].append(follow_up)
+                return f"Thank you for your response. {follow_up}"
+            
+            if stream:
+                chunks = stream_tech_question(
+                    model,
+                    state.current_tech,
+                    previous_answer=user_input,
+                    question_number=state.questions_asked + 1
+                )
+                return llm.stream_reply("Thank you for your response. ", chunks, candidate_info["questions"].append)
+            
+            follow_up = generate_tech_question(
+                model, 
+                state.current_tech, 
+                previous_answer=user_input,
+                question_number=state.questions_asked + 1
+            )
+            candidate_info["questions"].append(follow_up)
+            return f"Thank you for your response. {follow_up}"
+        else:
+            state.current_tech_index += 1
+            state.questions_asked = 0
+            
+            if state.current_tech_index < len(candidate_info["tech_stack"]):
+                state.current_tech = candidate_info["tech_stack"][state.current_tech_index]
+                next_question = next_opening_question(model, state, question_bank)
+                candidate_info["questions"].append(next_question)
+                return f"Now, let's talk about your experience with {state.current_tech}. {next_question}"
+            else:
+                state.current_state = "farewell"
+                # on_finish copies the record under the lock, so a late assessment can't
+                # change it mid-copy
+                with state.lock:
+                    candidate_info["sentiment_score"] = state.sentiment_score
+                    candidate_info["exit_state"] = "completed"
+                    on_finish(model, state)
+                
+                return "Thank you for answering all the technical questions! Your responses have been recorded. A TalentScout recruiter will contact you soon if your profile matches our open positions. Is there anything else you'd like to add before we conclude?"
+    
+    elif current_state == "farewell":
+        return "Thank you for your time! Your information has been recorded. Feel free to reach out if you have any questions about the process. Have a great day!"
+    
+    else:
+        return generate_chat_reply(model, state, user_input, stream)
@@ -0,0 +1,372 @@
+import asyncio
+import contextvars
+import functools
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import telemetry
+
+# ---------- LLM EXECUTION LAYER ----------
+# Gemini calls spend almost all of their time waiting on the network, so a small
+# shared pool lets independent calls of the same turn overlap instead of queueing.
+LLM_WORKERS = int(os.getenv("LLM_WORKERS", "8"))
+
+_executor = ThreadPoolExecutor(max_workers=LLM_WORKERS, thread_name_prefix="llm")
+
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.0-flash-lite")
+# Unset means the library default (gRPC); either transport keeps its connection open
+# for as long as genai isn't reconfigured, which is why the client is built once per process
+GEMINI_TRANSPORT = os.getenv("GEMINI_TRANSPORT") or None
+
+def generation_config_from_env():
+    config = {}
+    if os.getenv("GEMINI_TEMPERATURE"):
+        config["temperature"] = float(os.getenv("GEMINI_TEMPERATURE"))
+    if os.getenv("GEMINI_MAX_OUTPUT_TOKENS"):
+        config["max_output_tokens"] = int(os.getenv("GEMINI_MAX_OUTPUT_TOKENS"))
+    return config or None
+
+def create_model(api_key, model_name=GEMINI_MODEL, generation_config=None):
+    # The SDK takes most of a second to import, so it's only loaded when a model is built
+    import google.generativeai as genai
+
+    genai.configure(api_key=api_key, transport=GEMINI_TRANSPORT)
+    return genai.GenerativeModel(model_name, generation_config=generation_config or generation_config_from_env())
+
+def submit(fn, *args, **kwargs):
+    return _executor.submit(fn, *args, **kwargs)
+
+# ---------- RATE LIMITING ----------
+# Every Gemini call in the process goes through one limiter sized to the project's
+# quota (requests and tokens per minute), so bursts queue up here instead of coming
+# back as 429s. Interactive calls (questions the candidate is waiting on) always go
+# ahead of background work such as grading and answer analysis.
+INTERACTIVE = 0
+BACKGROUND = 1
+
+LLM_REQUESTS_PER_MINUTE = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "30"))
+LLM_TOKENS_PER_MINUTE = float(os.getenv("LLM_TOKENS_PER_MINUTE", "1000000"))
+LLM_BURST = int(os.getenv("LLM_BURST", "5"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "30"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF = float(os.getenv("LLM_BACKOFF", "1.0"))
+LLM_MAX_BACKOFF = float(os.getenv("LLM_MAX_BACKOFF", "20.0"))
+
+@functools.lru_cache(maxsize=None)
+def api_errors():
+    # Imported on the first failure only; returns (retryable, rate limit, timeout) error classes.
+    # Stub-only setups don't install the SDK: there only the builtin network errors retry.
+    try:
+        from google.api_core import exceptions as api_exceptions
+    except ImportError:
+        return (TimeoutError, ConnectionError), (), (TimeoutError,)
+
+    rate_limit = (api_exceptions.ResourceExhausted, api_exceptions.TooManyRequests)
+    timeout = (api_exceptions.DeadlineExceeded, TimeoutError)
+    retryable = rate_limit + timeout + (
+        api_exceptions.ServiceUnavailable, api_exceptions.InternalServerError, ConnectionError,
+    )
+    return retryable, rate_limit, timeout
+
+def estimate_tokens(text):
+    # Roughly four characters per token for English prompts
+    return max(1, len(text) // 4)
+
+class RateLimiter:
+    def __init__(self, requests_per_minute=LLM_REQUESTS_PER_MINUTE, tokens_per_minute=LLM_TOKENS_PER_MINUTE, burst=LLM_BURST):
+        self.request_rate = requests_per_minute / 60.0
+        self.token_rate = tokens_per_minute / 60.0
+        self.request_capacity = max(1, burst)
+        # The token bucket holds at most ten seconds worth of budget
+        self.token_capacity = max(1.0, self.token_rate * 10)
+        self._requests = float(self.request_capacity)
+        self._tokens = self.token_capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiting = [0, 0]
+        self._cond = threading.Condition()
+
+    def acquire(self, priority=INTERACTIVE, tokens=1):
+        # Returns True when the caller had to wait (a throttling event)
+        tokens = min(tokens, self.token_capacity)
+        waited = False
+        with self._cond:
+            self._waiting[priority] += 1
+            try:
+                while True:
+                    now = time.monotonic()
+                    self._refill(now)
+                    blocked_by_priority = any(self._waiting[:priority])
+                    if (now >= self._paused_until and not blocked_by_priority
+                            and self._requests >= 1 and self._tokens >= tokens):
+                        self._requests -= 1
+                        self._tokens -= tokens
+                        return waited
+                    waited = True
+                    delay = max(
+                        self._paused_until - now,
+                        (1 - self._requests) / self.request_rate,
+                        (tokens - self._tokens) / self.token_rate,
+                        0.05,
+                    )
+                    self._cond.wait(delay)
+            finally:
+                self._waiting[priority] -= 1
+                self._cond.notify_all()
+
+    def pause(self, seconds):
+        # A 429 means the quota window is exhausted; hold everyone back, not just the caller
+        with self._cond:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.request_capacity, self._requests + elapsed * self.request_rate)
+        self._tokens = min(self.token_capacity, self._tokens + elapsed * self.token_rate)
+
+rate_limiter = RateLimiter()
+
+def backoff_delay(attempt, base=LLM_BACKOFF, cap=LLM_MAX_BACKOFF):
+    # Full jitter keeps retrying callers from hitting the API in lockstep
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+class LLMClient:
+    # Drop-in for GenerativeModel.generate_content with rate limiting, timeouts and retries
+    def __init__(self, model, limiter=rate_limiter, timeout=LLM_TIMEOUT, max_retries=LLM_MAX_RETRIES, priority=INTERACTIVE):
+        # model may also be a Future while it is still being built in the background
+        self._model = model
+        self.limiter = limiter
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.priority = priority
+        self.health = {"status": "unknown"}
+
+    @property
+    def model(self):
+        if isinstance(self._model, Future):
+            self._model = self._model.result()
+        return self._model
+
+    def config_error(self, wait=True):
+        # What building the model raised, or None. Without wait, a build still in
+        # progress counts as fine, so page renders don't block on the SDK import.
+        if isinstance(self._model, Future):
+            if not wait and not self._model.done():
+                return None
+            return self._model.exception()
+        return None
+
+    def with_priority(self, priority):
+        return LLMClient(self._model, self.limiter, self.timeout, self.max_retries, priority)
+
+    def warm_up(self):
+        # A token count opens the connection (TLS, channel setup) without paying for a generation
+        started = time.perf_counter()
+        try:
+            self.model.count_tokens("ping", request_options={"timeout": self.timeout})
+            self.health = {"status": "ok", "latency": time.perf_counter() - started}
+        except Exception as e:
+            self.health = {"status": "error", "latency": time.perf_counter() - started, "error": str(e)}
+        return self.health
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        kwargs.setdefault("request_options", {"timeout": self.timeout})
+        operation = telemetry.current_operation.get()
+        registry = telemetry.registry
+        for attempt in range(self.max_retries + 1):
+            if self.limiter and self.limiter.acquire(self.priority, estimate_tokens(prompt)):
+                registry.incr("llm_throttled_total", operation=operation)
+            started = time.perf_counter()
+            try:
+                response = self.model.generate_content(prompt, stream=stream, **kwargs)
+                registry.incr("llm_calls_total", operation=operation)
+                if stream:
+                    return TracedStream(response, started, lambda text, usage, first_chunk: record_llm_call(
+                        operation, prompt, text, usage, started, first_chunk
+                    ))
+                record_llm_call(operation, prompt, response_text(response), getattr(response, "usage_metadata", None), started)
+                return response
+            except Exception as e:
+                retryable, rate_limit, timeout = api_errors()
+                if isinstance(e, rate_limit):
+                    registry.incr("llm_rate_limited_total", operation=operation)
+                elif isinstance(e, timeout):
+                    registry.incr("llm_timeouts_total", operation=operation)
+                if not isinstance(e, retryable) or attempt == self.max_retries:
+                    registry.incr("llm_errors_total", operation=operation)
+                    raise
+                delay = backoff_delay(attempt)
+                if isinstance(e, rate_limit) and self.limiter:
+                    self.limiter.pause(delay)
+                registry.incr("llm_retries_total", operation=operation)
+                time.sleep(delay)
+
+# ---------- TRACING ----------
+def response_text(response):
+    try:
+        return response.text
+    except ValueError:
+        return ""
+
+def record_llm_call(operation, prompt, text, usage, started, first_chunk=None):
+    # Gemini reports exact token counts in usage_metadata; other models fall back to estimates
+    prompt_tokens = getattr(usage, "prompt_token_count", None) or estimate_tokens(prompt)
+    response_tokens = getattr(usage, "candidates_token_count", None) or (estimate_tokens(text) if text else 0)
+    telemetry.registry.incr("llm_prompt_tokens_total", prompt_tokens, operation=operation)
+    telemetry.registry.incr("llm_response_tokens_total", response_tokens, operation=operation)
+    attributes = {
+        "operation": operation, "prompt_chars": len(prompt), "response_chars": len(text),
+        "prompt_tokens": prompt_tokens, "response_tokens": response_tokens,
+    }
+    if first_chunk is not None:
+        attributes["first_chunk_seconds"] = first_chunk
+    telemetry.registry.record_span("llm_request", time.perf_counter() - started, **attributes)
+
+class TracedStream:
+    # Passes chunks through unchanged and records the call once the stream is exhausted
+    def __init__(self, response, started, on_complete):
+        self._response = response
+        self._started = started
+        self._on_complete = on_complete
+
+    def __iter__(self):
+        first_chunk = None
+        parts = []
+        usage = None
+        for chunk in self._response:
+            if first_chunk is None:
+                first_chunk = time.perf_counter() - self._started
+            parts.append(response_text(chunk))
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            yield chunk
+        self._on_complete("".join(parts), usage, first_chunk)
+
+# ---------- ASYNC CLIENTS ----------
+async def in_context(context, coroutine):
+    for var, value in context.items():
+        var.set(value)
+    return await coroutine
+
+class AsyncModelBridge:
+    # Presents an async model (anything with generate_content_async, such as
+    # GenerativeModel) to the synchronous interview flow. The request is awaited on
+    # the event loop, but the calling thread (a turn thread, or an LLM pool thread for
+    # background work) still blocks until it completes.
+    def __init__(self, model, loop):
+        self.model = model
+        self.loop = loop
+
+    def _wait(self, coroutine):
+        # The loop runs the request in its own context, so the caller's (telemetry's
+        # current operation) is carried over
+        return asyncio.run_coroutine_threadsafe(in_context(contextvars.copy_context(), coroutine), self.loop).result()
+
+    def count_tokens(self, contents, **kwargs):
+        return self.model.count_tokens(contents, **kwargs)
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        response = self._wait(self.model.generate_content_async(prompt, stream=stream, **kwargs))
+        if not stream:
+            return response
+        return self._iterate(response.__aiter__())
+
+    def _iterate(self, chunks):
+        while True:
+            try:
+                yield self._wait(chunks.__anext__())
+            except StopAsyncIteration:
+                return
+
+# ---------- STREAMING ----------
+def stream_text(response):
+    # Chunks can come back without text (e.g. safety-filtered), those are skipped
+    for chunk in response:
+        try:
+            text = chunk.text
+        except ValueError:
+            continue
+        if text:
+            yield text
+
+def stream_reply(prefix, chunks, on_complete=None):
+    yield prefix
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    if on_complete:
+        on_complete("".join(parts).strip())
+
+# ---------- STUB MODEL ----------
+# Offline stand-in for GenerativeModel (batch grading dry runs, benchmarks). Replies
+# are deterministic per prompt; latency and jitter simulate the network round trip.
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+    def __iter__(self):
+        # stream=True yields the reply word by word like Gemini's chunked responses
+        words = self.text.split(" ")
+        for i, word in enumerate(words):
+            yield StubResponse(word if i == len(words) - 1 else word + " ")
+
+    async def _async_chunks(self):
+        for chunk in self:
+            yield chunk
+
+    def __aiter__(self):
+        return self._async_chunks()
+
+def stub_responder(prompt, operation):
+    # The reply's shape follows the traced operation making the call; anything else gets a question
+    digest = int(hashlib.md5(prompt.encode("utf-8")).hexdigest(), 16)
+    question = f"How would you diagnose a performance problem in this area (variant {digest % 97})?"
+    assessment = "The answer is technically sound but could go deeper into trade-offs."
+    if operation == "grade_candidates_packed":
+        ids = re.findall(r"Candidate ID: (\d+)", prompt)
+        return json.dumps({candidate_id: 1 + (digest + int(candidate_id)) % 10 for candidate_id in ids})
+    if operation == "assess_answer":
+        result = {"assessment": assessment, "score": 1 + digest % 10}
+        if '"next_question"' in prompt:
+            result["next_question"] = question
+        return json.dumps(result)
+    if operation == "grade_candidate":
+        return str(1 + digest % 10)
+    if operation == "analyze_answer":
+        return assessment
+    return question
+
+class StubModel:
+    def __init__(self, latency=0.0, jitter=0.0, responder=stub_responder):
+        self.latency = latency
+        self.jitter = jitter
+        self.responder = responder
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def count_tokens(self, contents, **kwargs):
+        return estimate_tokens(contents)
+
+    def _delay(self):
+        with self._lock:
+            self.calls += 1
+        return self.latency + random.uniform(-self.jitter, self.jitter)
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        delay = self._delay()
+        if delay > 0:
+            time.sleep(delay)
+        return StubResponse(self.responder(prompt, telemetry.current_operation.get()))
+
+    async def generate_content_async(self, prompt, stream=False, **kwargs):
+        delay = self._delay()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return StubResponse(self.responder(prompt, telemetry.current_operation.get()))
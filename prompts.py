@@ -0,0 +1,148 @@
+import json
+import os
+
+import llm
+import telemetry
+
+# ---------- PROMPT BUDGET ----------
+# Prompts are assembled from sections under a token budget, so their size stays flat
+# however many technologies the candidate lists. Candidate data is serialized
+# compactly, and the Q&A is carried as a short per-tech summary that is updated as
+# each answer (and later its analysis) arrives instead of being re-sent verbatim.
+# Each technology gets one bounded digest line, and tight budgets shorten every
+# digest rather than dropping the earliest technologies.
+PROMPT_TOKEN_BUDGET = int(os.getenv("PROMPT_TOKEN_BUDGET", "1500"))
+
+QUESTION_CHARS = 160
+ANSWER_CHARS = 240
+ANALYSIS_CHARS = 160
+MESSAGE_CHARS = 400
+USER_INPUT_CHARS = 1000
+TECH_DIGEST_CHARS = 800
+MIN_LINE_CHARS = 60
+
+PROFILE_FIELDS = ("name", "email", "phone", "experience", "desired_position", "location", "tech_stack")
+
+def compact_json(value):
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+
+def clip(text, max_chars):
+    text = " ".join(str(text or "").split())
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars - 3].rstrip() + "..."
+
+def first_sentence(text):
+    text = " ".join(str(text or "").split())
+    end = text.find(". ")
+    return text[:end + 1] if end != -1 else text
+
+def candidate_profile(candidate_info):
+    return compact_json({
+        field: candidate_info.get(field) for field in PROFILE_FIELDS if candidate_info.get(field)
+    })
+
+# ---------- TECH SUMMARIES ----------
+# candidate_info["tech_summaries"] maps each technology to [answer index, line] pairs.
+# A line is written when the answer comes in and rewritten once its analysis lands.
+# They are derived from the Q&A, so stored candidates and checkpoints leave them out
+# and they are rebuilt from answer_techs when needed.
+def summary_line(candidate_info, index):
+    questions = candidate_info.get("questions", [])
+    analyses = candidate_info.get("analyses", [])
+    line = f"Q: {clip(questions[index] if index < len(questions) else '', QUESTION_CHARS)} | "
+    line += f"A: {clip(candidate_info['answers'][index], ANSWER_CHARS)}"
+    analysis = analyses[index] if index < len(analyses) else None
+    if analysis:
+        line += f" | Assessment: {clip(first_sentence(analysis), ANALYSIS_CHARS)}"
+    return line
+
+def update_tech_summary(candidate_info, tech, index):
+    entries = candidate_info.setdefault("tech_summaries", {}).setdefault(tech, [])
+    line = summary_line(candidate_info, index)
+    for entry in entries:
+        if entry[0] == index:
+            entry[1] = line
+            return
+    entries.append([index, line])
+
+def build_tech_summaries(candidate_info):
+    summaries = {}
+    answers = candidate_info.get("answers", [])
+    for index, tech in enumerate(candidate_info.get("answer_techs", [])[:len(answers)]):
+        if tech is not None:
+            summaries.setdefault(tech, []).append([index, summary_line(candidate_info, index)])
+    return summaries
+
+def tech_digest(tech, entries, max_chars=TECH_DIGEST_CHARS):
+    # The technology's answers share one line evenly, and within an answer its question,
+    # answer and assessment do, so the line stays the same size however many questions
+    # the technology got and a short one still has a bit of each
+    share = max_chars // max(1, len(entries))
+    digests = []
+    for _, line in entries:
+        parts = line.split(" | ")
+        digests.append(" | ".join(clip(part, max(20, share // len(parts))) for part in parts))
+    return clip(f"{tech}: " + " || ".join(digests), max_chars + len(tech) + 2)
+
+def transcript_lines(candidate_info, max_chars=TECH_DIGEST_CHARS):
+    summaries = candidate_info.get("tech_summaries") or build_tech_summaries(candidate_info)
+    if summaries:
+        return [tech_digest(tech, entries, max_chars) for tech, entries in summaries.items() if entries]
+    # Records from before answers were tagged by tech: fall back to the clipped Q&A pairs
+    return [summary_line(candidate_info, index) for index in range(len(candidate_info.get("answers", [])))]
+
+# ---------- PROMPT BUILDER ----------
+class PromptBuilder:
+    def __init__(self, budget=PROMPT_TOKEN_BUDGET, name="prompt"):
+        self.budget = budget
+        self.name = name
+        self._sections = []
+
+    def add(self, text, priority=0, title=None, shorten=None):
+        # priority 0 is always kept whole; higher numbers are filled in order with what's
+        # left of the budget, dropping their oldest (first) lines when they don't fit.
+        # shorten(max_chars) rebuilds the lines at most max_chars long; when given, every
+        # line is shortened to an equal share first so all of them stay.
+        lines = text if isinstance(text, list) else [text]
+        self._sections.append({
+            "title": title, "lines": [line for line in lines if line], "priority": priority, "shorten": shorten,
+        })
+        return self
+
+    def build(self):
+        remaining = self.budget
+        kept = [None] * len(self._sections)
+        order = sorted(range(len(self._sections)), key=lambda i: self._sections[i]["priority"])
+        for i in order:
+            section = self._sections[i]
+            lines = section["lines"]
+            if section["priority"] > 0:
+                lines = self._fit(section, remaining)
+            kept[i] = lines
+            remaining -= sum(llm.estimate_tokens(line) for line in lines)
+
+        parts = []
+        for section, lines in zip(self._sections, kept):
+            if not lines:
+                continue
+            parts.append((f"{section['title']}:\n" if section["title"] else "") + "\n".join(lines))
+        return "\n\n".join(parts)
+
+    def _fit(self, section, remaining):
+        lines = section["lines"]
+        if section["shorten"] and sum(llm.estimate_tokens(line) for line in lines) > remaining:
+            # estimate_tokens counts four characters per token
+            share = max(MIN_LINE_CHARS, remaining * 4 // max(1, len(lines)))
+            telemetry.registry.incr("prompt_lines_shortened_total", len(lines), prompt=self.name)
+            lines = [clip(line, share) for line in section["shorten"](share) if line]
+        used = 0
+        start = len(lines)
+        # Newest lines are the most relevant, so the section is filled from the end
+        while start > 0 and used + llm.estimate_tokens(lines[start - 1]) <= remaining:
+            start -= 1
+            used += llm.estimate_tokens(lines[start])
+        if start:
+            telemetry.registry.incr("prompt_lines_dropped_total", start, prompt=self.name)
+            return [f"({start} earlier lines omitted)"] + lines[start:] if start < len(lines) else []
+        return lines
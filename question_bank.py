@@ -0,0 +1,129 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# ---------- QUESTION BANK ----------
+# Opening questions only depend on the technology, so they are cached on disk and
+# shared by every interview. Each key is generated a few times before it starts
+# serving hits, and hits rotate through the distinct variants so candidates don't all
+# get the same one. Repeats count too: a model that keeps returning the same question
+# (low temperature, the stub) would otherwise never fill a key.
+QUESTION_CACHE_PATH = os.getenv("QUESTION_CACHE_PATH", ".question_cache.json")
+QUESTION_CACHE_TTL = float(os.getenv("QUESTION_CACHE_TTL", str(7 * 24 * 3600)))
+QUESTION_CACHE_SIZE = int(os.getenv("QUESTION_CACHE_SIZE", "500"))
+QUESTION_CACHE_VARIANTS = int(os.getenv("QUESTION_CACHE_VARIANTS", "5"))
+# Prefetches run on their own small pool, so warming later techs never takes an LLM
+# thread away from a question a candidate is waiting on
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "4"))
+
+_prefetch_executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+
+TECH_ALIASES = {
+    "js": "javascript", "ts": "typescript", "py": "python",
+    "golang": "go", "node": "node.js", "nodejs": "node.js",
+    "reactjs": "react", "react.js": "react", "vuejs": "vue", "vue.js": "vue",
+    "postgres": "postgresql", "psql": "postgresql", "mongo": "mongodb",
+    "k8s": "kubernetes", "c sharp": "c#", "cpp": "c++",
+}
+
+def normalize_tech(tech):
+    name = re.sub(r"\s+", " ", tech.strip().lower())
+    name = TECH_ALIASES.get(name, name)
+    # "Python3", "python 3.11" and "HTML5" share an entry; short names like "S3" keep their digits
+    base = re.sub(r"[\s-]*v?\d+(\.\d+)*$", "", name)
+    if len(base) >= 3:
+        name = base
+    return TECH_ALIASES.get(name, name)
+
+class QuestionBank:
+    def __init__(self, path=QUESTION_CACHE_PATH, ttl=QUESTION_CACHE_TTL,
+                 max_entries=QUESTION_CACHE_SIZE, variants=QUESTION_CACHE_VARIANTS):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.variants = variants
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._load()
+
+    def get_question(self, tech, question_number, generate):
+        key = f"{normalize_tech(tech)}#{question_number}"
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry and entry["variants"] and entry["generated"] >= self.variants:
+                question = entry["variants"][entry["next"] % len(entry["variants"])]
+                entry["next"] += 1
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return question
+            self.misses += 1
+
+        question = generate()
+
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is None:
+                entry = {"created": time.time(), "variants": [], "generated": 0, "next": 0}
+                self._entries[key] = entry
+            if question:
+                entry["generated"] += 1
+                if question not in entry["variants"]:
+                    entry["variants"].append(question)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._save()
+        return question
+
+    def prefetch(self, techs, generate):
+        # Warm the opening questions of techs asked about later; callers wait on the futures in order
+        return [_prefetch_executor.submit(self.get_question, tech, 1, lambda tech=tech: generate(tech)) for tech in techs]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+            }
+
+    def _live_entry(self, key):
+        entry = self._entries.get(key)
+        if entry and time.time() - entry["created"] > self.ttl:
+            del self._entries[key]
+            return None
+        return entry
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as cache_file:
+                data = json.load(cache_file)
+        except (OSError, ValueError):
+            return
+        now = time.time()
+        for key, entry in data.get("entries", []):
+            if now - entry.get("created", 0) <= self.ttl:
+                entry["next"] = 0
+                entry.setdefault("generated", len(entry.get("variants", [])))
+                self._entries[key] = entry
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _save(self):
+        # Entries are written in LRU order so eviction survives a restart
+        data = {"version": 1, "entries": [[key, {"created": e["created"], "variants": e["variants"], "generated": e["generated"]}] for key, e in self._entries.items()]}
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as cache_file:
+                json.dump(data, cache_file)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass
@@ -0,0 +1,180 @@
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+# ---------- REPORT GENERATION ----------
+styles = getSampleStyleSheet()
+# Plain word wrapping; long tokens are still split, without measuring every character like CJK wrapping
+CELL_STYLE = ParagraphStyle("ReportCell", parent=styles["Normal"], splitLongWords=1)
+
+BASIC_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+    ('TEXTCOLOR', (0, 0), (0, -1), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+QA_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+    ('TOPPADDING', (0, 0), (-1, -1), 6),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black)
+])
+
+REPORT_CACHE_SIZE = 5000
+# Letter page minus the default 1" margins and frame padding
+CONTENT_WIDTH = letter[0] - 2 * 72 - 12
+
+def sentiment_label(sentiment):
+    if sentiment > 3:
+        return "Very Positive"
+    elif sentiment > 0:
+        return "Positive"
+    elif sentiment < 0:
+        return "Negative"
+    return "Neutral"
+
+def grade_label(candidate):
+    grade = candidate.get("grade")
+    if grade is not None:
+        return f"{grade}/10"
+    return candidate.get("grade_status", "Not graded").capitalize()
+
+def draw_page_number(canvas, doc):
+    canvas.saveState()
+    canvas.setFont("Helvetica", 8)
+    canvas.drawRightString(letter[0] - 72, 36, f"Page {doc.page}")
+    canvas.restoreState()
+
+class ReportBuilder:
+    # A stored record only changes when it is graded or regraded, or its sentiment is
+    # rescored (sentiment.py), so its table cells (including the parsed Paragraphs) are
+    # prepared once and reused until one of those changes.
+    # The Table wrappers are rebuilt per report: Table keeps layout state from its
+    # previous build and can't be laid out twice.
+    def __init__(self, max_cached=REPORT_CACHE_SIZE):
+        self.max_cached = max_cached
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        # Cached Paragraphs are re-wrapped on every build, so builds can't overlap
+        self._build_lock = threading.Lock()
+
+    def candidate_flowables(self, candidate):
+        basic_data, qa_data = self._candidate_cells(candidate)
+        basic_table = Table(basic_data, colWidths=[100, CONTENT_WIDTH - 100])
+        basic_table.setStyle(BASIC_TABLE_STYLE)
+        flowables = [basic_table]
+
+        if len(qa_data) > 1:
+            flowables.append(Paragraph("<br/>Technical Assessment:", styles["Heading3"]))
+            qa_table = Table(qa_data, colWidths=[CONTENT_WIDTH / 2, CONTENT_WIDTH / 2])
+            qa_table.setStyle(QA_TABLE_STYLE)
+            flowables.append(qa_table)
+        return flowables
+
+    def _candidate_cells(self, candidate):
+        key = candidate.get("id")
+        version = (
+            candidate.get("grade"), candidate.get("grade_status"), candidate.get("sentiment_score", 0),
+            len(candidate.get("questions", [])), len(candidate.get("answers", [])),
+        )
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached and cached[0] == version:
+                self._cache.move_to_end(key)
+                return cached[1]
+
+        sentiment = candidate.get("sentiment_score", 0)
+        basic_data = [
+            ["Email", candidate.get("email") or "N/A"],
+            ["Phone", candidate.get("phone") or "N/A"],
+            ["Experience", candidate.get("experience") or "N/A"],
+            ["Position", candidate.get("desired_position") or "N/A"],
+            ["Location", candidate.get("location") or "N/A"],
+            ["Tech Stack", ", ".join(candidate.get("tech_stack", []))],
+            ["Sentiment Score", f"{sentiment} ({sentiment_label(sentiment)})"],
+            ["AI Grade", grade_label(candidate)]
+        ]
+        qa_data = [["Question", "Answer"]]
+        for q, a in zip(candidate.get("questions", []), candidate.get("answers", [])):
+            qa_data.append([Paragraph(escape(q), CELL_STYLE), Paragraph(escape(a), CELL_STYLE)])
+
+        cells = (basic_data, qa_data)
+        if key is not None:
+            with self._cache_lock:
+                self._cache[key] = (version, cells)
+                while len(self._cache) > self.max_cached:
+                    self._cache.popitem(last=False)
+        return cells
+
+    def build(self, candidates, total=None, on_progress=None):
+        # Collecting flowables is the first half of the progress bar, laying out pages the second
+        def report(fraction):
+            if on_progress:
+                on_progress(min(1.0, fraction))
+
+        elements = [
+            Paragraph(f"TalentScout Candidates Report - {datetime.now().strftime('%Y-%m-%d')}", styles["Heading1"]),
+            Spacer(1, 24),
+        ]
+        for idx, candidate in enumerate(candidates):
+            name = escape(candidate.get("name") or "Unknown")
+            elements.append(Paragraph(f"Candidate #{idx+1}: {name}", styles["Heading2"]))
+            elements.extend(self.candidate_flowables(candidate))
+            elements.append(Spacer(1, 24))
+            if total:
+                report(0.5 * (idx + 1) / total)
+
+        buffer = BytesIO()
+        doc = SimpleDocTemplate(buffer, pagesize=letter)
+        flowable_count = len(elements)
+
+        def layout_progress(kind, value):
+            if kind == "PROGRESS" and flowable_count:
+                report(0.5 + 0.5 * value / flowable_count)
+
+        doc.setProgressCallBack(layout_progress)
+        with self._build_lock:
+            doc.build(elements, onFirstPage=draw_page_number, onLaterPages=draw_page_number)
+        report(1.0)
+        return buffer.getvalue()
+
+class ReportJob:
+    # Runs a report build on its own thread so the Streamlit script run isn't blocked;
+    # the admin panel polls progress/status and serves the bytes once done.
+    def __init__(self, builder, store, **filters):
+        self.filters = filters
+        self.progress = 0.0
+        self.status = "running"
+        self.result = None
+        self.error = None
+        self.candidate_count = 0
+        self._thread = threading.Thread(target=self._run, args=(builder, store), daemon=True)
+        self._thread.start()
+
+    def _run(self, builder, store):
+        try:
+            self.candidate_count = store.count(**self.filters)
+            self.result = builder.build(
+                store.iter_all(**self.filters), total=self.candidate_count, on_progress=self._set_progress
+            )
+            self.status = "done"
+        except Exception as e:
+            self.error = str(e)
+            self.status = "failed"
+
+    def _set_progress(self, fraction):
+        self.progress = fraction
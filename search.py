@@ -0,0 +1,205 @@
+import heapq
+import itertools
+import re
+import threading
+import time
+
+from question_bank import normalize_tech
+from sentiment import tokenize
+
+# ---------- CANDIDATE SEARCH ----------
+# An in-memory inverted index over completed candidates: normalized tech stack
+# entries, position and location words, and the words of every answer. Like the
+# analytics frame it is filled once and then only reads candidates added or updated
+# since the last refresh (by row version), so a query is a handful of set lookups
+# and intersections instead of a scan over every record. Updates only change a stored
+# interview's grade or sentiment score, and only the grade is indexed, so that is all
+# an update re-indexes.
+#
+# Queries combine terms with AND (or a comma) and OR, in any case, e.g.
+#   Kafka AND Go, grade >= 7
+#   position:backend, location:berlin OR location:munich
+#   answer:idempotent, tech:postgres
+#   answer:read and write, location:trinidad and tobago
+# A bare term matches a technology, position or location; answer text is only
+# searched with answer:. A term after a lowercase and/or keeps the field of the term
+# before it, so natural-language phrases stay within their field.
+SEARCH_REFRESH_INTERVAL = 1.0
+SEARCH_RESULT_LIMIT = 200
+
+FIELD_ALIASES = {
+    "tech": "tech", "skill": "tech", "stack": "tech",
+    "position": "position", "role": "position",
+    "location": "location", "city": "location",
+    "answer": "answer", "answers": "answer", "text": "answer",
+}
+
+GRADE_PATTERN = re.compile(r"^grade\s*(>=|≥|<=|≤|==|=|>|<)\s*(\d+)$", re.I)
+GRADE_OPERATORS = {
+    ">=": lambda grade, value: grade >= value, "≥": lambda grade, value: grade >= value,
+    "<=": lambda grade, value: grade <= value, "≤": lambda grade, value: grade <= value,
+    ">": lambda grade, value: grade > value, "<": lambda grade, value: grade < value,
+    "=": lambda grade, value: grade == value, "==": lambda grade, value: grade == value,
+}
+
+def _split_operator(text, pattern):
+    # (part, continues) pairs; a part continues the previous one when the operator
+    # before it is written in lowercase, as in "read and write"
+    parts = re.split(f"({pattern})", text, flags=re.I)
+    yield parts[0], False
+    for operator, part in zip(parts[1::2], parts[2::2]):
+        yield part, operator.islower()
+
+def parse_query(query):
+    # A list of clauses that must all match, each a list of alternatives:
+    # ("grade", operator, value) or (field, text), where field None means any structured field
+    clauses = []
+    field = None
+    for clause, clause_continues in _split_operator(query, r",|\bAND\b"):
+        alternatives = []
+        for index, (term, term_continues) in enumerate(_split_operator(clause, r"\bOR\b")):
+            continues = clause_continues if index == 0 else term_continues
+            term = term.strip()
+            if not term:
+                continue
+            grade_match = GRADE_PATTERN.match(term)
+            if grade_match:
+                alternatives.append(("grade", grade_match.group(1), int(grade_match.group(2))))
+                field = None
+                continue
+            name, _, value = term.partition(":")
+            if value and name.strip().lower() in FIELD_ALIASES:
+                field = FIELD_ALIASES[name.strip().lower()]
+                alternatives.append((field, value.strip()))
+            elif continues and field is not None:
+                # "answer:read and write" searches the answers for both words
+                alternatives.append((field, term))
+            else:
+                field = None
+                alternatives.append((None, term))
+        if alternatives:
+            clauses.append(alternatives)
+    return clauses
+
+class CandidateIndex:
+    def __init__(self, store, refresh_interval=SEARCH_REFRESH_INTERVAL):
+        self.store = store
+        self.refresh_interval = refresh_interval
+        self._postings = {"tech": {}, "position": {}, "location": {}, "answer": {}}
+        self._grades = {}
+        self._by_grade = {}
+        self._labels = {}
+        self._newest_id = 0
+        self._last_version = 0
+        self._refreshed_at = 0.0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._labels)
+
+    def refresh(self, force=False):
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._refreshed_at < self.refresh_interval:
+                return
+            self._refreshed_at = now
+            for version, candidate in self.store.iter_changed(after_version=self._last_version):
+                if candidate["id"] in self._labels:
+                    # Graded, or regraded by the batch CLI
+                    self._set_grade(candidate["id"], candidate.get("grade"))
+                else:
+                    self._add(candidate)
+                    self._newest_id = max(self._newest_id, candidate["id"])
+                self._last_version = version
+
+    def _add(self, candidate):
+        candidate_id = candidate["id"]
+        terms = {
+            "tech": {normalize_tech(tech) for tech in candidate.get("tech_stack") or [] if tech},
+            "position": set(tokenize(candidate.get("desired_position") or "")),
+            "location": set(tokenize(candidate.get("location") or "")),
+            "answer": {token for answer in candidate.get("answers") or [] for token in tokenize(answer)},
+        }
+        for field, field_terms in terms.items():
+            postings = self._postings[field]
+            for term in field_terms:
+                postings.setdefault(term, set()).add(candidate_id)
+        self._labels[candidate_id] = candidate.get("email") or f"Unknown-{candidate_id}"
+        self._set_grade(candidate_id, candidate.get("grade"))
+
+    def _set_grade(self, candidate_id, grade):
+        previous = self._grades.pop(candidate_id, None)
+        if previous is not None:
+            self._by_grade[previous].discard(candidate_id)
+        if grade is not None:
+            self._grades[candidate_id] = grade
+            self._by_grade.setdefault(grade, set()).add(candidate_id)
+
+    def _term_ids(self, field, text):
+        if field == "tech":
+            return self._postings["tech"].get(normalize_tech(text), set())
+        if field is None:
+            # Any structured field: the technology as named, or all words of a position or location
+            sets = [self._postings["tech"].get(normalize_tech(text), set())]
+            sets += [self._all_words(word_field, text) for word_field in ("position", "location")]
+            sets = [ids for ids in sets if ids]
+            if len(sets) <= 1:
+                return sets[0] if sets else set()
+            return set().union(*sets)
+        return self._all_words(field, text)
+
+    def _all_words(self, field, text):
+        postings = self._postings[field]
+        word_sets = sorted((postings.get(word, set()) for word in set(tokenize(text))), key=len)
+        if not word_sets:
+            return set()
+        return word_sets[0].intersection(*word_sets[1:])
+
+    def _grade_ids(self, operator, value):
+        compare = GRADE_OPERATORS[operator]
+        return set().union(*(ids for grade, ids in self._by_grade.items() if compare(grade, value)))
+
+    def _grade_matches(self, alternatives, candidate_id):
+        grade = self._grades.get(candidate_id)
+        return grade is not None and any(GRADE_OPERATORS[operator](grade, value) for _, operator, value in alternatives)
+
+    def search(self, query, limit=SEARCH_RESULT_LIMIT):
+        # Newest first, as (id, label) pairs
+        self.refresh()
+        clauses = parse_query(query)
+        if not clauses:
+            return []
+        with self._lock:
+            matches, grade_filters = [], []
+            for alternatives in clauses:
+                if all(alternative[0] == "grade" for alternative in alternatives):
+                    grade_filters.append(alternatives)
+                    continue
+                # Posting sets are used as they are (never copied or modified) unless an OR needs a union
+                sets = [
+                    self._grade_ids(alternative[1], alternative[2]) if alternative[0] == "grade" else self._term_ids(*alternative)
+                    for alternative in alternatives
+                ]
+                matches.append(sets[0] if len(sets) == 1 else set().union(*sets))
+            if not matches:
+                # Only grade conditions: every candidate is checked, newest first
+                matches.append(self._labels)
+            # Smallest set first keeps every intersection step as cheap as possible; grade
+            # conditions are then checked per remaining candidate instead of building grade sets
+            matches.sort(key=len)
+            result = matches[0].intersection(*matches[1:]) if len(matches) > 1 else matches[0]
+            if grade_filters:
+                matching = lambda candidate_id: all(self._grade_matches(alternatives, candidate_id) for alternatives in grade_filters)
+            else:
+                matching = lambda candidate_id: True
+            if len(result) * len(result) > limit * len(self._labels):
+                # A broad result: walking ids down from the newest finds `limit` matches
+                # long before sorting the whole set would
+                newest = (
+                    candidate_id for candidate_id in range(self._newest_id, 0, -1)
+                    if candidate_id in result and matching(candidate_id)
+                )
+                ids = list(itertools.islice(newest, limit))
+            else:
+                ids = heapq.nlargest(limit, (candidate_id for candidate_id in result if matching(candidate_id)))
+            return [(candidate_id, self._labels[candidate_id]) for candidate_id in ids]
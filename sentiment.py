@@ -0,0 +1,102 @@
+import argparse
+import re
+import time
+
+# ---------- SENTIMENT ANALYSIS ----------
+# Messages are tokenized once and each token is looked up in a lexicon that already
+# contains the common inflections ("thanks", "struggling", "worried"), so scoring is a
+# single pass whose cost doesn't grow with the word lists, and "hard" no longer
+# matches inside "hardware".
+POSITIVE_WORDS = [
+    'happy', 'great', 'good', 'excellent', 'thank', 'appreciate', 'excited',
+    'love', 'enjoy', 'passionate', 'interested', 'eager', 'enthusiastic', 
+    'delighted', 'pleased', 'satisfied', 'helpful', 'positive', 'wonderful',
+    'fantastic', 'amazing', 'awesome', 'impressive', 'brilliant', 'valuable',
+    'confident', 'skilled', 'capable', 'successful', 'experienced', 'effective'
+]
+
+NEGATIVE_WORDS = [
+    'bad', 'poor', 'frustrated', 'annoyed', 'difficult', 'problem', 'issue',
+    'hate', 'dislike', 'boring', 'confused', 'challenging', 'hard', 'worry',
+    'concerned', 'trouble', 'disappointed', 'negative', 'terrible', 'horrible',
+    'awful', 'unfortunate', 'struggle', 'complicated', 'uncertain', 'doubt',
+    'lacking', 'insufficient', 'ineffective', 'dissatisfied', 'unfamiliar'
+]
+
+TOKEN_PATTERN = re.compile(r"[a-z]+")
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(text.lower())
+
+def _inflections(word):
+    stem = word[:-1] if word.endswith("e") else word
+    forms = {word, word + "s", word + "ly", word + "ful", word + "fully", stem + "ed", stem + "ing"}
+    if word.endswith("y"):
+        forms |= {word[:-1] + "ies", word[:-1] + "ied"}
+    return forms
+
+def _build_lexicon():
+    # Maps every form to (base word, polarity); base words win over generated forms
+    lexicon = {}
+    for words, polarity in ((POSITIVE_WORDS, 1), (NEGATIVE_WORDS, -1)):
+        for word in words:
+            for form in _inflections(word):
+                lexicon.setdefault(form, (word, polarity))
+    for words, polarity in ((POSITIVE_WORDS, 1), (NEGATIVE_WORDS, -1)):
+        for word in words:
+            lexicon[word] = (word, polarity)
+    return lexicon
+
+LEXICON = _build_lexicon()
+
+def analyze_sentiment(text):
+    return score_many((text,))[0]
+
+def score_many(texts):
+    # Each lexicon word counts once per text, however often it's repeated
+    lexicon = LEXICON
+    findall = TOKEN_PATTERN.findall
+    return [
+        sum(polarity for _, polarity in {lexicon[t] for t in findall(text.lower()) if t in lexicon})
+        for text in texts
+    ]
+
+CANDIDATE_TEXT_FIELDS = ("name", "email", "phone", "experience", "desired_position", "location")
+
+def candidate_texts(candidate):
+    texts = [candidate.get(field) or "" for field in CANDIDATE_TEXT_FIELDS]
+    texts.append(", ".join(candidate.get("tech_stack", [])))
+    texts.extend(candidate.get("answers", []))
+    return texts
+
+def rescore_candidates(candidates):
+    # Recomputes stored scores after lexicon changes, e.g. rescore_candidates(store.iter_all()).
+    # Only stored fields are scored: the live score also counted inputs that were
+    # rejected (an invalid email or phone), so it can differ without a lexicon change.
+    for candidate in candidates:
+        yield candidate, sum(score_many(candidate_texts(candidate)))
+
+def main():
+    from candidate_store import CANDIDATE_DB_PATH, CandidateStore
+
+    parser = argparse.ArgumentParser(description="Recompute the sentiment score of stored TalentScout candidates.")
+    parser.add_argument("--db", default=CANDIDATE_DB_PATH, help="candidate database path")
+    parser.add_argument("--dry-run", action="store_true", help="only report how many scores would change")
+    args = parser.parse_args()
+
+    store = CandidateStore(args.db)
+    checked = changed = 0
+    started = time.perf_counter()
+    for candidate, score in rescore_candidates(store.iter_all()):
+        checked += 1
+        if candidate.get("sentiment_score") == score:
+            continue
+        changed += 1
+        if not args.dry_run:
+            candidate["sentiment_score"] = score
+            store.update(candidate)
+    action = "would change" if args.dry_run else "updated"
+    print(f"Rescored {checked} candidate(s), {changed} {action} in {time.perf_counter() - started:.1f}s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+import traceback
+from collections import OrderedDict
+
+import llm
+import telemetry
+from candidate_store import CandidateStore
+from grading import GradingQueue
+import interview
+from interview import INTERVIEW_WORKERS, SERVICE_UNAVAILABLE_MESSAGE, InterviewSession
+from question_bank import QuestionBank
+from session_store import SessionStore, new_token
+
+# ---------- HTTP FRONTEND ----------
+# A small JSON API over the same InterviewSession engine the Streamlit app uses.
+# Sessions are plain objects in memory, so one process can hold many interviews, but
+# the flow itself is synchronous: each turn runs on one of INTERVIEW_WORKERS threads,
+# which caps the turns in progress at once; further turns queue. Every turn is
+# checkpointed, so after a restart a session is reloaded on its next request. The
+# same reload brings back sessions dropped from memory: finished ones, ones idle for
+# SESSION_IDLE_TIMEOUT, and the least recently used beyond MAX_SESSIONS_IN_MEMORY.
+#
+#   POST /sessions                  -> {"session_id", "reply"}
+#   POST /sessions/<id>/messages    {"message": "..."} -> {"reply", "state"}
+#   GET  /sessions/<id>             -> {"state", "messages"}
+SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "8080"))
+SERVER_BACKLOG = 1024
+SESSION_IDLE_TIMEOUT = float(os.getenv("SESSION_IDLE_TIMEOUT", "900"))
+MAX_SESSIONS_IN_MEMORY = int(os.getenv("MAX_SESSIONS_IN_MEMORY", "10000"))
+MAX_BODY_BYTES = 64 * 1024
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class InterviewServer:
+    def __init__(self, model, question_bank, store, grading_queue, session_store,
+                 idle_timeout=SESSION_IDLE_TIMEOUT, max_sessions=MAX_SESSIONS_IN_MEMORY):
+        self.model = model
+        self.question_bank = question_bank
+        self.store = store
+        self.grading_queue = grading_queue
+        self.session_store = session_store
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        # Least recently used first
+        self.sessions = OrderedDict()
+        self._locks = {}
+        self._last_used = {}
+        self._active = {}
+
+    def finish_interview(self, model, state):
+        interview.finish_interview(model, state, self.grading_queue, self.store)
+
+    async def _session(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = await asyncio.get_running_loop().run_in_executor(None, self.session_store.load, session_id)
+            if session is None:
+                raise HTTPError(404, "Unknown session")
+            # Two requests may have loaded it at once; both must end up with the same object
+            session = self.sessions.setdefault(session_id, session)
+            self._locks.setdefault(session_id, asyncio.Lock())
+        self._touch(session_id)
+        return session
+
+    def _touch(self, session_id):
+        self.sessions.move_to_end(session_id)
+        self._last_used[session_id] = time.monotonic()
+
+    def _evict(self):
+        # Only sessions with no turn running or waiting are dropped; their checkpoint
+        # stays in the session store
+        now = time.monotonic()
+        for session_id in list(self.sessions):
+            if len(self.sessions) <= self.max_sessions and now - self._last_used[session_id] < self.idle_timeout:
+                # Ordered by last use, so every session after this one is newer
+                break
+            if not self._active.get(session_id):
+                del self.sessions[session_id]
+                del self._locks[session_id]
+                del self._last_used[session_id]
+                telemetry.registry.incr("sessions_evicted_total")
+
+    async def _checkpoint(self, session_id, session):
+        await asyncio.get_running_loop().run_in_executor(None, self.session_store.save, session_id, session)
+
+    async def route(self, method, path, body):
+        parts = [part for part in path.split("?")[0].split("/") if part]
+        self._evict()
+        if method == "POST" and parts == ["sessions"]:
+            session_id = new_token()
+            session = self.sessions[session_id] = InterviewSession()
+            self._locks[session_id] = asyncio.Lock()
+            self._touch(session_id)
+            reply = session.start()
+            await self._checkpoint(session_id, session)
+            return {"session_id": session_id, "reply": reply}
+        if method == "GET" and len(parts) == 2 and parts[0] == "sessions":
+            session = await self._session(parts[1])
+            return {"state": session.current_state, "messages": session.messages}
+        if method == "POST" and len(parts) == 3 and parts[0] == "sessions" and parts[2] == "messages":
+            session = await self._session(parts[1])
+            message = str(body.get("message") or "").strip()
+            if not message:
+                raise HTTPError(400, "message is required")
+            # Turns of one session are serialized; different sessions run concurrently
+            session_id = parts[1]
+            self._active[session_id] = self._active.get(session_id, 0) + 1
+            try:
+                async with self._locks[session_id]:
+                    try:
+                        reply = await session.respond(self.model, message, self.question_bank, self.finish_interview)
+                    except Exception:
+                        telemetry.registry.incr("turn_fallbacks_total", state=session.current_state)
+                        return {"reply": SERVICE_UNAVAILABLE_MESSAGE, "state": session.current_state, "retry": True}
+                    await self._checkpoint(session_id, session)
+            finally:
+                self._active[session_id] -= 1
+                if not self._active[session_id]:
+                    del self._active[session_id]
+            if session.current_state == "farewell" and session_id in self.sessions:
+                # Finished: first in line for eviction
+                self._last_used[session_id] = float("-inf")
+                self.sessions.move_to_end(session_id, last=False)
+            return {"reply": reply, "state": session.current_state}
+        raise HTTPError(404, "Not found")
+
+    async def handle_connection(self, reader, writer):
+        try:
+            request_line = (await reader.readline()).decode("latin-1").split()
+            headers = {}
+            while True:
+                line = (await reader.readline()).decode("latin-1").strip()
+                if not line:
+                    break
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+            try:
+                if len(request_line) < 2:
+                    raise HTTPError(400, "Bad request")
+                try:
+                    length = int(headers.get("content-length", "0"))
+                except ValueError:
+                    raise HTTPError(400, "Invalid Content-Length")
+                if length < 0:
+                    raise HTTPError(400, "Invalid Content-Length")
+                if length > MAX_BODY_BYTES:
+                    raise HTTPError(413, "Request body too large")
+                raw_body = await reader.readexactly(length) if length else b""
+                try:
+                    body = json.loads(raw_body) if raw_body else {}
+                except ValueError:
+                    raise HTTPError(400, "Body must be JSON")
+                if not isinstance(body, dict):
+                    raise HTTPError(400, "Body must be a JSON object")
+                status, payload = 200, await self.route(request_line[0], request_line[1], body)
+            except HTTPError as e:
+                status, payload = e.status, {"error": str(e)}
+            except (ConnectionError, asyncio.IncompleteReadError):
+                raise
+            except Exception:
+                # Anything else (a failing session store, a bug) still gets a reply
+                traceback.print_exc()
+                telemetry.registry.incr("http_errors_total")
+                status, payload = 500, {"error": "Internal server error"}
+            data = json.dumps(payload).encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode("latin-1")
+                + data
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+async def serve(host, port, stub_latency=None):
+    loop = asyncio.get_running_loop()
+    if stub_latency is not None:
+        # The stub has no quota, so it isn't rate limited
+        base_model = llm.StubModel(latency=stub_latency, jitter=stub_latency / 4)
+        limiter = None
+    else:
+        from dotenv import load_dotenv
+        load_dotenv()
+        base_model = await loop.run_in_executor(None, llm.create_model, os.getenv("GEMINI_API_KEY"))
+        limiter = llm.rate_limiter
+    model = llm.LLMClient(llm.AsyncModelBridge(base_model, loop), limiter=limiter)
+    store, grading_queue = CandidateStore(), GradingQueue()
+    # Records a previous run left pending are graded again
+    grading_queue.resume(model.with_priority(llm.BACKGROUND), store)
+    app = InterviewServer(model, QuestionBank(), store, grading_queue, SessionStore())
+    server = await asyncio.start_server(app.handle_connection, host, port, backlog=SERVER_BACKLOG)
+    print(f"Serving interviews on http://{host}:{port} (up to {INTERVIEW_WORKERS} turns at once)")
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve TalentScout interviews over a JSON HTTP API.")
+    parser.add_argument("--host", default=SERVER_HOST)
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    parser.add_argument("--stub", action="store_true", help="use the offline stub model instead of Gemini")
+    parser.add_argument("--stub-latency", type=float, default=0.2, help="simulated stub latency in seconds")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.stub_latency if args.stub else None))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
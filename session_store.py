@@ -0,0 +1,96 @@
+import json
+import os
+import secrets
+import sqlite3
+import threading
+import time
+import zlib
+
+import telemetry
+from candidate_store import CANDIDATE_DB_PATH
+from interview import InterviewSession
+
+# ---------- SESSION STORE ----------
+# In-progress interviews are checkpointed after every turn, keyed by a random
+# session token, so a server restart or a recycled worker doesn't send candidates
+# back to the start. Snapshots are compact JSON, zlib-compressed, and expire
+# SESSION_TTL seconds after their last turn.
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", CANDIDATE_DB_PATH)
+SESSION_TTL = float(os.getenv("SESSION_TTL", str(24 * 3600)))
+SESSION_EVICT_INTERVAL = 600
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS interview_sessions (
+    token TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    updated_at REAL NOT NULL,
+    data BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_interview_sessions_updated ON interview_sessions(updated_at);
+"""
+
+def new_token():
+    return secrets.token_urlsafe(16)
+
+class SessionStore:
+    def __init__(self, path=SESSION_DB_PATH, ttl=SESSION_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._last_eviction = 0.0
+        conn = self._connect()
+        with conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def save(self, token, session):
+        with telemetry.span("session_checkpoint"):
+            snapshot = session.to_snapshot()
+            data = zlib.compress(json.dumps(snapshot, separators=(",", ":")).encode("utf-8"))
+            now = time.time()
+            conn = self._connect()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO interview_sessions (token, version, updated_at, data) VALUES (?, ?, ?, ?)",
+                    (token, snapshot["version"], now, data),
+                )
+        # Expired snapshots are swept from the write path, at most once per interval
+        if now - self._last_eviction > SESSION_EVICT_INTERVAL:
+            self._last_eviction = now
+            self.evict_expired(now)
+
+    def load(self, token):
+        row = self._connect().execute(
+            "SELECT data FROM interview_sessions WHERE token = ? AND updated_at >= ?", (token, time.time() - self.ttl)
+        ).fetchone()
+        if row is None:
+            return None
+        try:
+            session = InterviewSession.from_snapshot(json.loads(zlib.decompress(row[0])))
+        except (ValueError, zlib.error):
+            # A snapshot from an incompatible version is as good as none
+            telemetry.registry.incr("session_restore_failures_total")
+            return None
+        telemetry.registry.incr("sessions_resumed_total")
+        return session
+
+    def delete(self, token):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM interview_sessions WHERE token = ?", (token,))
+
+    def evict_expired(self, now=None):
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                "DELETE FROM interview_sessions WHERE updated_at < ?", ((now or time.time()) - self.ttl,)
+            )
+        return cursor.rowcount
@@ -0,0 +1,168 @@
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ---------- METRICS ----------
+# Process-wide counters, latency histograms and a ring buffer of recent spans.
+# Exported in Prometheus text format, either to a file (METRICS_FILE) or over
+# HTTP (METRICS_PORT), and summarized in the admin panel.
+METRICS_FILE = os.getenv("METRICS_FILE")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+METRICS_INTERVAL = float(os.getenv("METRICS_INTERVAL", "15"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Name of the app-level operation (generate_tech_question, grade_candidate, ...) the
+# current thread is running, so LLM calls can be attributed to it
+current_operation = contextvars.ContextVar("current_operation", default="other")
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v)}"' for k, v in labels) + "}"
+
+class Registry:
+    def __init__(self, max_spans=200):
+        self._counters = {}
+        self._histograms = {}
+        self._spans = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def incr(self, name, amount=1, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, value, **labels):
+        key = _key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {"buckets": [0] * len(LATENCY_BUCKETS), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if value <= bound:
+                    histogram["buckets"][i] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def record_span(self, name, duration, **attributes):
+        self.observe(f"{name}_seconds", duration, **{k: v for k, v in attributes.items() if isinstance(v, str)})
+        with self._lock:
+            self._spans.append({"name": name, "at": time.time(), "duration": duration, **attributes})
+
+    def total(self, name):
+        with self._lock:
+            return sum(value for (counter, _), value in self._counters.items() if counter == name)
+
+    def counters(self):
+        with self._lock:
+            return [(name, dict(labels), value) for (name, labels), value in sorted(self._counters.items())]
+
+    def histograms(self):
+        with self._lock:
+            return [
+                (name, dict(labels), histogram["count"], histogram["sum"])
+                for (name, labels), histogram in sorted(self._histograms.items())
+            ]
+
+    def recent_spans(self, limit=50):
+        with self._lock:
+            return list(self._spans)[-limit:]
+
+    def render_prometheus(self):
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((key, dict(value, buckets=list(value["buckets"]))) for key, value in self._histograms.items())
+        declared = set()
+        for (name, labels), value in counters:
+            if name not in declared:
+                lines.append(f"# TYPE {name} counter")
+                declared.add(name)
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for (name, labels), histogram in histograms:
+            if name not in declared:
+                lines.append(f"# TYPE {name} histogram")
+                declared.add(name)
+            for bound, count in zip(LATENCY_BUCKETS, histogram["buckets"]):
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {count}")
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {histogram['count']}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram['sum']:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+@contextmanager
+def span(name, **attributes):
+    started = time.perf_counter()
+    try:
+        yield attributes
+    finally:
+        registry.record_span(name, time.perf_counter() - started, **attributes)
+
+def traced(operation):
+    # Times the wrapped function and tags any LLM calls it makes with the operation name
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            token = current_operation.set(operation)
+            try:
+                with span("operation", operation=operation):
+                    return fn(*args, **kwargs)
+            except Exception:
+                registry.incr("operation_errors_total", operation=operation)
+                raise
+            finally:
+                current_operation.reset(token)
+        return wrapper
+    return decorator
+
+# ---------- EXPORTERS ----------
+def write_metrics_file(path):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as metrics_file:
+        metrics_file.write(registry.render_prometheus())
+    os.replace(tmp_path, path)
+
+def start_file_exporter(path=METRICS_FILE, interval=METRICS_INTERVAL):
+    def export():
+        while True:
+            try:
+                write_metrics_file(path)
+            except OSError:
+                pass
+            time.sleep(interval)
+
+    thread = threading.Thread(target=export, name="metrics-file", daemon=True)
+    thread.start()
+    return thread
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = registry.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_http_exporter(port=METRICS_PORT, host=METRICS_HOST):
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server